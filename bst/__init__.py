@@ -1,2 +1,8 @@
 from .avlTree import TreeNode
 from .avlTree import AvlTree
+from .avlTree import AvlMap
+from .persistentAvlTree import PersistentAvlTree
+from .sortedBlockList import SortedBlockList
+from .frozenAvlTree import FrozenAvlTree
+from .frozenAvlTree import FrozenAvlMap
+from .concurrentAvlTree import ConcurrentAvlTree
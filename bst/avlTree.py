@@ -1,21 +1,83 @@
+import copy
+
+from .frozenAvlTree import FrozenAvlTree
+from .frozenAvlTree import FrozenAvlMap
+
+# marks a missing key, None being a valid key
+_NOKEY = object()
+
 '''
 A Binary Search Tree node. 
 '''
 class TreeNode:
 
+    __slots__ = ('key', 'data', 'count', 'left', 'right', 'height', 'size', 'agg')
+
     '''
-    Calculates the Height of a given node.
+    Calculates the Height of a given node by walking its whole subtree.
+
+    This is O(n) and only kept for validating the cached heights, use
+    TreeNode.getHeight for balancing.
     '''
     @staticmethod
     def calculateHeight(node):
-        if node.left == None and node.right == None:
-            return 1
-        elif node.left == None:
-            return 1 + TreeNode.calculateHeight(node.right)
-        elif node.right == None:
-            return 1 + TreeNode.calculateHeight(node.left)
+        height = 0
+        level = [node]
+        while level:
+            height = height + 1
+            nextLevel = []
+            for cur in level:
+                if cur.left is not None:
+                    nextLevel.append(cur.left)
+                if cur.right is not None:
+                    nextLevel.append(cur.right)
+            level = nextLevel
+        return height
+
+    '''
+    Gets the cached Height of a given node, 0 for an empty tree.
+    '''
+    @staticmethod
+    def getHeight(node):
+        if node is None:
+            return 0
+        return node.height
+
+    '''
+    Gets the number of occurrences in the tree rooted at 'node', that is
+    the sum of the node counts, 0 for an empty tree.
+    '''
+    @staticmethod
+    def getSize(node):
+        if node is None:
+            return 0
+        return node.size
+
+    '''
+    Recomputes the cached Height and Size of 'node' from its immediate children,
+    along with its aggregate when a Monoid is given.
+
+    The children must already hold correct values.
+    '''
+    @staticmethod
+    def update(node, monoid=None):
+        left = node.left
+        right = node.right
+        if left is None:
+            leftHeight = 0
+            size = node.count
         else:
-            return 1 + max(TreeNode.calculateHeight(node.left), TreeNode.calculateHeight(node.right))
+            leftHeight = left.height
+            size = node.count + left.size
+        if right is None:
+            rightHeight = 0
+        else:
+            rightHeight = right.height
+            size = size + right.size
+        node.height = 1 + (leftHeight if leftHeight > rightHeight else rightHeight)
+        node.size = size
+        if monoid is not None:
+            monoid.update(node)
 
     '''
     Gets the Left most TreeNode in the tree rooted at 'node'
@@ -24,10 +86,9 @@ class TreeNode:
     def getLeftMost(node):
         if node == None:
             return None
-        elif node.left == None:
-            return node
-        else:
-            return TreeNode.getLeftMost(node)
+        while node.left is not None:
+            node = node.left
+        return node
 
     '''
     Gets the Right most TreeNode in the tree rooted at 'node'
@@ -36,52 +97,230 @@ class TreeNode:
     def getRightMost(node):
         if node == None:
             return None
-        elif node.right == None:
-            return node
-        else:
-            return TreeNode.getRightMost(node)
+        while node.right is not None:
+            node = node.right
+        return node
 
     '''
-    Gets the TreeNode containing the given data from the tree
+    Gets the TreeNode with the given key from the tree
     rooted at 'node'
 
     Returns the TreeNode if found, None otherwise.
     '''
     @staticmethod
-    def getChildNode(data, node):
-        if node == None:
-            return None
-        elif data == node.data:
-            return node
-        elif data < node.data:
-            return TreeNode.getChildNode(data, node.left)
-        else:
-            return TreeNode.getChildNode(data, node.right)
+    def getChildNode(key, node):
+        while node is not None:
+            nodeKey = node.key
+            if key == nodeKey:
+                return node
+            elif key < nodeKey:
+                node = node.left
+            else:
+                node = node.right
+        return None
+
+    '''
+    Gets the TreeNode with the largest key at most 'key', or strictly
+    smaller than 'key' if 'inclusive' is False, from the tree rooted
+    at 'node'
+
+    Returns the TreeNode if found, None otherwise.
+    '''
+    @staticmethod
+    def getFloor(key, node, inclusive=True):
+        best = None
+        while node is not None:
+            nodeKey = node.key
+            if key < nodeKey:
+                node = node.left
+            elif nodeKey < key:
+                best = node
+                node = node.right
+            elif inclusive:
+                return node
+            else:
+                node = node.left
+        return best
+
+    '''
+    Gets the TreeNode with the smallest key at least 'key', or strictly
+    larger than 'key' if 'inclusive' is False, from the tree rooted
+    at 'node'
+
+    Returns the TreeNode if found, None otherwise.
+    '''
+    @staticmethod
+    def getCeiling(key, node, inclusive=True):
+        best = None
+        while node is not None:
+            nodeKey = node.key
+            if nodeKey < key:
+                node = node.right
+            elif key < nodeKey:
+                best = node
+                node = node.left
+            elif inclusive:
+                return node
+            else:
+                node = node.right
+        return best
 
     '''
     Creates an in-order list of the tree rooted at 'node'
     '''
     @staticmethod
     def listify(node, retList):
-        if node == None:
-            return retList
-        if not node.left == None:
-            retList = TreeNode.listify(node.left, retList)
-        retList.append(node.data)
-        if not node.right == None:
-            retList = TreeNode.listify(node.right, retList)
+        stack = []
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                retList.append(node.data)
+                if node.count > 1:
+                    retList.extend([node.data] * (node.count - 1))
+                node = node.right
         return retList
-    
+
+    '''
+    Creates a shallow copy of 'node', sharing its children.
+    '''
+    @staticmethod
+    def copy(node):
+        newNode = TreeNode.__new__(TreeNode)
+        newNode.key = node.key
+        newNode.data = node.data
+        newNode.count = node.count
+        newNode.left = node.left
+        newNode.right = node.right
+        newNode.height = node.height
+        newNode.size = node.size
+        newNode.agg = node.agg
+        return newNode
+
+    '''
+    Lazily iterates over the TreeNodes of the tree rooted at 'node',
+    in-order, or in reverse order if 'reverse' is True.
+    '''
+    @staticmethod
+    def inOrder(node, reverse=False):
+        stack = []
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.right if reverse else node.left
+            else:
+                node = stack.pop()
+                yield node
+                node = node.left if reverse else node.right
+
+    '''
+    Lazily iterates, in-order, over the TreeNodes of the tree rooted at
+    'node' with keys between 'lo' and 'hi', in O(log n + k) for k results.
+
+    A bound of None is unbounded on that side. 'inclusive' is a pair of
+    booleans telling whether lo and hi themselves are part of the range.
+    '''
+    @staticmethod
+    def inRange(node, lo=None, hi=None, inclusive=(True, True)):
+        loInclusive, hiInclusive = inclusive
+        stack = []
+        # seek the smallest node inside the lower bound, keeping the path
+        # of nodes still to be visited
+        while node is not None:
+            key = node.key
+            if lo is None or key > lo or (loInclusive and key == lo):
+                stack.append(node)
+                node = node.left
+            else:
+                node = node.right
+        while stack:
+            node = stack.pop()
+            key = node.key
+            if hi is not None and (key > hi or (not hiInclusive and key == hi)):
+                return
+            yield node
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
     '''
     Creates a TreeNode object with the given data.
     Optional parameters:
         left <TreeNode> The immediate left child
         right <TreeNode> The immediate right child
+        key <any> The key the node is ordered by, the data itself by default
     '''
-    def __init__(self, data, left=None, right=None):
+    def __init__(self, data, left=None, right=None, key=_NOKEY):
+        self.key = data if key is _NOKEY else key
         self.data = data
+        self.count = 1
         self.left = left
         self.right = right
+        self.height = 1
+        self.size = 1
+        self.agg = None
+        if not (left == None and right == None):
+            TreeNode.update(self)
+
+'''
+An associative combine function together with its identity, used by an
+AvlTree to keep the aggregate of every subtree in TreeNode.agg.
+
+The optional measureFunc maps the data of a node to the value that gets
+combined, by default the data itself.
+'''
+class Monoid:
+
+    __slots__ = ('combine', 'identity', 'measure')
+
+    def __init__(self, combineFunc, identity, measureFunc=None):
+        self.combine = combineFunc
+        self.identity = identity
+        if measureFunc == None:
+            self.measure = AvlTree.defaultAddFunc
+        else:
+            self.measure = measureFunc
+
+    '''
+    Combines 'value' with itself 'count' times, count being at least 1,
+    in O(log count) combines.
+    '''
+    def repeat(self, value, count):
+        result = None
+        while count > 0:
+            if count & 1:
+                result = value if result is None else self.combine(result, value)
+            count = count >> 1
+            if count > 0:
+                value = self.combine(value, value)
+        return result
+
+    '''
+    Gets the combined value of a single node's data, taking every
+    occurrence of a multiset node into account.
+    '''
+    def nodeValue(self, node):
+        value = self.measure(node.data)
+        if node.count != 1:
+            value = self.repeat(value, node.count)
+        return value
+
+    '''
+    Recomputes the aggregate of 'node' from its data and its immediate
+    children, in in-order: left, node, right.
+    '''
+    def update(self, node):
+        value = self.nodeValue(node)
+        left = node.left
+        if left is not None:
+            value = self.combine(left.agg, value)
+        right = node.right
+        if right is not None:
+            value = self.combine(value, right.agg)
+        node.agg = value
 
 '''
 Class Representation of a Self-Balancing binary search tree. 
@@ -90,6 +329,9 @@ AVL Tree Implementation
 '''
 class AvlTree:
 
+    # class of the snapshots freeze creates
+    frozenTree = FrozenAvlTree
+
     '''
     Default Clash Resolution where data == root.data
 
@@ -103,19 +345,30 @@ class AvlTree:
     def defaultAddFunc(data):
         return data
 
+    '''
+    Clash Resolution of a multiset, counting one more occurrence of
+    the node's data.
+    '''
+    @staticmethod
+    def countClash(data, root):
+        root.count = root.count + 1
+        return root
+
     '''
     Rotation method used to ensure self-balancing.
 
     Case: Left-Left Rotation
     '''
     @staticmethod
-    def leftRotation(root):
+    def leftRotation(root, monoid=None):
         if root == None:
             return None
         else:
             newRoot = root.right
             root.right = newRoot.left
             newRoot.left = root
+            TreeNode.update(root, monoid)
+            TreeNode.update(newRoot, monoid)
             return newRoot
 
     '''
@@ -124,13 +377,15 @@ class AvlTree:
     Case: Right-Right Rotation
     '''
     @staticmethod
-    def rightRotation(root):
+    def rightRotation(root, monoid=None):
         if root == None:
             return None
         else:
             newRoot = root.left
             root.left = newRoot.right
             newRoot.right = root
+            TreeNode.update(root, monoid)
+            TreeNode.update(newRoot, monoid)
             return newRoot
 
     '''
@@ -139,12 +394,12 @@ class AvlTree:
     Case: Left-Right Rotation
     '''
     @staticmethod
-    def leftRightRotation(root):
+    def leftRightRotation(root, monoid=None):
         if root == None:
             return None
         else:
-            root.left = AvlTree.leftRotation(root.left)
-            return AvlTree.rightRotation(root)
+            root.left = AvlTree.leftRotation(root.left, monoid)
+            return AvlTree.rightRotation(root, monoid)
 
     '''
     Rotation method used to ensure self-balancing.
@@ -152,122 +407,478 @@ class AvlTree:
     Case: Right-Left Rotation
     '''
     @staticmethod
-    def rightLeftRotation(root):
+    def rightLeftRotation(root, monoid=None):
         if root == None:
             return None
         else:
-            root.right = AvlTree.rightRotation(root.right)
-            return AvlTree.leftRotation(root)
+            root.right = AvlTree.rightRotation(root.right, monoid)
+            return AvlTree.leftRotation(root, monoid)
 
     '''
     Calculates the Balance Factor to determine if 
     the tree at the given root needs to be balanced.
+
+    Uses the cached node heights, so this is O(1).
     '''
     @staticmethod
     def calculateBalanceFactor(root):
         if root == None:
             return 0
         else:
-            leftHeight = 0
-            rightHeight = 0
-            if not root.left == None:
-                leftHeight = TreeNode.calculateHeight(root.left)
-            if not root.right == None:
-                rightHeight = TreeNode.calculateHeight(root.right)
-            return leftHeight - rightHeight
+            return TreeNode.getHeight(root.left) - TreeNode.getHeight(root.right)
 
     '''
     Self balancing method.
+
+    Refreshes the cached height and size of 'root' before checking the
+    balance, so it must be called on every node along a modified path,
+    bottom up.
     '''
     @staticmethod
-    def balance(root):
+    def balance(root, monoid=None):
         if root == None:
             return True
         else:
+            TreeNode.update(root, monoid)
             balanceFactor = AvlTree.calculateBalanceFactor(root)
             if abs(balanceFactor) > 1:
                 # Unbalanced
                 if balanceFactor > 0:
-                    if AvlTree.calculateBalanceFactor(root.left) > 0:
+                    if AvlTree.calculateBalanceFactor(root.left) >= 0:
                         # right rotation
-                        return AvlTree.rightRotation(root)
+                        return AvlTree.rightRotation(root, monoid)
                     else:
                         # left-right rotation
-                        return AvlTree.leftRightRotation(root)
+                        return AvlTree.leftRightRotation(root, monoid)
                 else:
-                    if AvlTree.calculateBalanceFactor(root.right) < 0:
+                    if AvlTree.calculateBalanceFactor(root.right) <= 0:
                         # left rotation
-                        return AvlTree.leftRotation(root)
+                        return AvlTree.leftRotation(root, monoid)
                     else:
                         # right-left rotation
-                        return AvlTree.rightLeftRotation(root)
+                        return AvlTree.rightLeftRotation(root, monoid)
             else:
                 # Already Balanced
                 return root
 
     '''
-    Recurisve helper method for insertion
+    Rebalances the nodes of 'path', a list of TreeNodes from the root down to
+    the parent of a modified subtree, bottom up.
+
+    Once a subtree keeps both its root and its height nothing above it can
+    need rebalancing, so the remaining ancestors only get their sizes and,
+    with a Monoid, their aggregates refreshed.
+
+    A rotated node is replaced in 'path' by the new root of its subtree
+    and the nodes below it are dropped, so the path still leads down from
+    the root afterwards.
+
+    Returns the (possibly new) root of the tree.
     '''
     @staticmethod
-    def insertRecursive(data, root, clash=None, addFunc=None):
-        if data < root.data:
-            if root.left == None:
-                # Base Case
-                if addFunc == None:
-                    root.left = TreeNode(addFunc(data))
-                else:
-                    root.left = TreeNode(data)
-                return root
+    def rebalancePath(path, root, monoid=None):
+        i = len(path) - 1
+        while i >= 0:
+            node = path[i]
+            left = node.left
+            right = node.right
+            if left is None:
+                leftHeight = 0
+                size = node.count
             else:
-                root.left = AvlTree.insertRecursive(data, root.left, clash, addFunc)
-                return AvlTree.balance(root)
-        elif data > root.data:
-            if root.right == None:
-                # Base Case
-                if addFunc == None:
-                    root.right = TreeNode(addFunc(data))
-                else:
-                    root.right = TreeNode(data)
-                return root
+                leftHeight = left.height
+                size = node.count + left.size
+            if right is None:
+                rightHeight = 0
+            else:
+                rightHeight = right.height
+                size = size + right.size
+            balanceFactor = leftHeight - rightHeight
+            if -1 <= balanceFactor <= 1:
+                height = 1 + (leftHeight if leftHeight > rightHeight else rightHeight)
+                if height == node.height:
+                    node.size = size
+                    if monoid is not None:
+                        monoid.update(node)
+                    i = i - 1
+                    while i >= 0:
+                        node = path[i]
+                        left = node.left
+                        right = node.right
+                        size = node.count
+                        if left is not None:
+                            size = size + left.size
+                        if right is not None:
+                            size = size + right.size
+                        node.size = size
+                        if monoid is not None:
+                            monoid.update(node)
+                        i = i - 1
+                    return root
+                node.height = height
+                node.size = size
+                if monoid is not None:
+                    monoid.update(node)
+                i = i - 1
+                continue
+            newNode = AvlTree.balance(node, monoid)
+            path[i] = newNode
+            del path[i + 1:]
+            if i == 0:
+                return newNode
+            parent = path[i - 1]
+            if parent.left is node:
+                parent.left = newNode
             else:
-                root.right = AvlTree.insertRecursive(data, root.right, clash, addFunc)
-                return AvlTree.balance(root)
+                parent.right = newNode
+            i = i - 1
+        return root
+
+    '''
+    Iterative helper method for insertion.
+
+    Walks down from 'root' keeping the visited nodes on an explicit path
+    stack, then rebalances that path. The data is ordered by 'key', or by
+    itself when no key is given.
+
+    The optional 'path' lists TreeNodes from the root down to a node whose
+    subtree must hold the key; the walk then starts from its last node
+    instead of the root. The path is extended in place and left as
+    rebalancePath leaves it.
+
+    Returns the new root of the tree.
+    '''
+    @staticmethod
+    def insertIterative(data, root, clash=None, addFunc=None, monoid=None, key=_NOKEY, path=None):
+        if addFunc == None:
+            addFunc = AvlTree.defaultAddFunc
+        if key is _NOKEY:
+            key = data
+        if root is None:
+            leaf = TreeNode(addFunc(data), key=key)
+            if monoid is not None:
+                monoid.update(leaf)
+            return leaf
+        if path is None:
+            path = []
+            node = root
         else:
-            # insert Recursive with data == root.data
-            if clash == None:
-                return root
+            node = path.pop()
+        while True:
+            nodeKey = node.key
+            if key < nodeKey:
+                path.append(node)
+                if node.left is None:
+                    leaf = node.left = TreeNode(addFunc(data), key=key)
+                    break
+                node = node.left
+            elif key > nodeKey:
+                path.append(node)
+                if node.right is None:
+                    leaf = node.right = TreeNode(addFunc(data), key=key)
+                    break
+                node = node.right
             else:
-                return clash(data, root)
-    
+                # key == node.key
+                if clash == None:
+                    return root
+                count = node.count
+                newNode = clash(data, node)
+                if newNode is node and monoid is None and node.count == count:
+                    return root
+                if not path:
+                    root = newNode
+                else:
+                    parent = path[-1]
+                    if parent.left is node:
+                        parent.left = newNode
+                    else:
+                        parent.right = newNode
+                # the clash may have changed the node's data or children
+                path.append(newNode)
+                return AvlTree.rebalancePath(path, root, monoid)
+        if monoid is not None:
+            monoid.update(leaf)
+        return AvlTree.rebalancePath(path, root, monoid)
+
     '''
-    Recurisve helper method for removal
+    Iterative helper method for removal of the node with the given key.
+
+    A node counting several occurrences only loses one of them, unless
+    'removeAll' is True.
+
+    Returns the new root of the tree.
     '''
     @staticmethod
-    def removeRecursive(data, root):
-        if root == None:
+    def removeIterative(key, root, monoid=None, removeAll=False):
+        path = []
+        node = root
+        while node is not None:
+            nodeKey = node.key
+            if key < nodeKey:
+                path.append(node)
+                node = node.left
+            elif key > nodeKey:
+                path.append(node)
+                node = node.right
+            else:
+                break
+        if node is None:
+            # not found
+            return root
+        if node.count > 1 and not removeAll:
+            node.count = node.count - 1
+            path.append(node)
+            return AvlTree.rebalancePath(path, root, monoid)
+        if node.left is not None and node.right is not None:
+            # replace with the in-order successor, then unlink the successor
+            path.append(node)
+            successor = node.right
+            while successor.left is not None:
+                path.append(successor)
+                successor = successor.left
+            node.key = successor.key
+            node.data = successor.data
+            node.count = successor.count
+            node = successor
+        child = node.left if node.left is not None else node.right
+        if not path:
+            return child
+        parent = path[-1]
+        if parent.left is node:
+            parent.left = child
+        else:
+            parent.right = child
+        return AvlTree.rebalancePath(path, root, monoid)
+
+    '''
+    Links an in-order list of TreeNodes into a perfectly balanced tree in
+    O(n), overwriting their children, heights, sizes and aggregates.
+    Node counts are kept.
+
+    Returns the root of the tree, None if 'nodes' is empty.
+    '''
+    @staticmethod
+    def buildBalanced(nodes, monoid=None):
+        root = None
+        stack = [(0, len(nodes), None, False)]
+        while stack:
+            lo, hi, parent, isLeft = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            node = nodes[mid]
+            node.left = None
+            node.right = None
+            # a midpoint split of m nodes is exactly m.bit_length() levels deep
+            node.height = (hi - lo).bit_length()
+            node.size = hi - lo
+            if parent is None:
+                root = node
+            elif isLeft:
+                parent.left = node
+            else:
+                parent.right = node
+            stack.append((lo, mid, node, True))
+            stack.append((mid + 1, hi, node, False))
+        if root is None:
             return None
-        elif data == root.data:
-            # found case to remove
-            if root.left == None and root.right == None:
-                return None
-            elif root.left == None:
-                # root.right is a TreeNode
-                return root.right
-            elif root.right == None:
-                # root.left is a TreeNode
-                return root.left
+        counted = False
+        for node in nodes:
+            if node.count != 1:
+                counted = True
+                break
+        if counted or monoid is not None:
+            # sizes and aggregates bottom up, children always sit on a lower level
+            levels = [[] for _ in range(root.height)]
+            for node in nodes:
+                levels[node.height - 1].append(node)
+            for level in levels:
+                for node in level:
+                    TreeNode.update(node, monoid)
+        return root
+
+    '''
+    Joins the trees rooted at 'left' and 'right' with 'node' between them,
+    where every key of left is smaller than node.key and every key of right
+    is larger, in O(|height(left) - height(right)| + 1).
+
+    The taller tree is descended along its inner spine to a subtree of about
+    the other's height, which is replaced by 'node' and rebalanced upwards.
+
+    Returns the root of the joined tree.
+    '''
+    @staticmethod
+    def joinNodes(left, node, right, monoid=None):
+        leftHeight = 0 if left is None else left.height
+        rightHeight = 0 if right is None else right.height
+        if leftHeight > rightHeight + 1:
+            path = []
+            cur = left
+            while cur is not None and cur.height > rightHeight + 1:
+                path.append(cur)
+                cur = cur.right
+            node.left = cur
+            node.right = right
+            TreeNode.update(node, monoid)
+            path[-1].right = node
+            return AvlTree.rebalancePath(path, left, monoid)
+        elif rightHeight > leftHeight + 1:
+            path = []
+            cur = right
+            while cur is not None and cur.height > leftHeight + 1:
+                path.append(cur)
+                cur = cur.left
+            node.left = left
+            node.right = cur
+            TreeNode.update(node, monoid)
+            path[-1].left = node
+            return AvlTree.rebalancePath(path, right, monoid)
+        else:
+            node.left = left
+            node.right = right
+            TreeNode.update(node, monoid)
+            return node
+
+    '''
+    Joins the trees rooted at 'left' and 'right', where every key of left
+    is smaller than every key of right, in O(log n).
+
+    Returns the root of the joined tree.
+    '''
+    @staticmethod
+    def joinTrees(left, right, monoid=None):
+        if left is None:
+            return right
+        if right is None:
+            return left
+        # detach the smallest node of right to join the trees around it
+        path = []
+        node = right
+        while node.left is not None:
+            path.append(node)
+            node = node.left
+        if path:
+            path[-1].left = node.right
+            right = AvlTree.rebalancePath(path, right, monoid)
+        else:
+            right = node.right
+        return AvlTree.joinNodes(left, node, right, monoid)
+
+    '''
+    Splits the tree rooted at 'root' around 'key' in O(log n), reusing
+    its nodes.
+
+    Returns a tuple (left, node, right) of the root of the keys smaller
+    than key, the detached node with the key (None if there is none) and
+    the root of the keys larger than key.
+    '''
+    @staticmethod
+    def splitNodes(root, key, monoid=None):
+        path = []
+        node = root
+        while node is not None:
+            nodeKey = node.key
+            if key < nodeKey:
+                path.append((node, True))
+                node = node.left
+            elif nodeKey < key:
+                path.append((node, False))
+                node = node.right
             else:
-                # root.left and root.right are TreeNodes
-                node = TreeNode.getLeftMost(root.right)
-                root.data = node.data
-                root.right = AvlTree.removeRecursive(data, root.right)
-                return AvlTree.balance(root)
-        elif data < root.data:
-            root.left = AvlTree.removeRecursive(data, root.left)
-            return AvlTree.balance(root)
+                break
+        if node is None:
+            left = None
+            right = None
         else:
-            root.right = AvlTree.removeRecursive(data, root.right)
-            return AvlTree.balance(root)
+            left = node.left
+            right = node.right
+            node.left = None
+            node.right = None
+            TreeNode.update(node, monoid)
+        # unwind the path, every ancestor joins the side it was not descended into
+        for parent, wentLeft in reversed(path):
+            if wentLeft:
+                right = AvlTree.joinNodes(right, parent, parent.right, monoid)
+            else:
+                left = AvlTree.joinNodes(parent.left, parent, left, monoid)
+        return (left, node, right)
+
+    '''
+    Merges the trees rooted at 'a' and 'b' in O(m log(n/m + 1)), m and n
+    being the smaller and larger sizes, reusing the nodes of both.
+
+    A key found in both trees keeps the node of 'a' and resolves the node
+    of 'b' with clash, or adds up their occurrences for countClash.
+    The recursion depth is bounded by the height of 'a'.
+
+    Returns the root of the union.
+    '''
+    @staticmethod
+    def unionNodes(a, b, clash=None, monoid=None):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        aLeft = a.left
+        aRight = a.right
+        bLeft, match, bRight = AvlTree.splitNodes(b, a.key, monoid)
+        left = AvlTree.unionNodes(aLeft, bLeft, clash, monoid)
+        right = AvlTree.unionNodes(aRight, bRight, clash, monoid)
+        node = a
+        if match is not None:
+            if clash is AvlTree.countClash:
+                node.count = node.count + match.count
+            elif not clash == None:
+                node = clash(match.data, a)
+        return AvlTree.joinNodes(left, node, right, monoid)
+
+    '''
+    Keeps the keys of the tree rooted at 'a' that are also found in the
+    tree rooted at 'b' in O(m log(n/m + 1)), reusing the nodes of 'a'.
+
+    With 'counted' True, multiset nodes keep the smaller of both counts.
+    The recursion depth is bounded by the height of 'a'.
+
+    Returns the root of the intersection.
+    '''
+    @staticmethod
+    def intersectionNodes(a, b, monoid=None, counted=False):
+        if a is None or b is None:
+            return None
+        aLeft = a.left
+        aRight = a.right
+        bLeft, match, bRight = AvlTree.splitNodes(b, a.key, monoid)
+        left = AvlTree.intersectionNodes(aLeft, bLeft, monoid, counted)
+        right = AvlTree.intersectionNodes(aRight, bRight, monoid, counted)
+        if match is None:
+            return AvlTree.joinTrees(left, right, monoid)
+        if counted and match.count < a.count:
+            a.count = match.count
+        return AvlTree.joinNodes(left, a, right, monoid)
+
+    '''
+    Removes the keys of the tree rooted at 'b' from the tree rooted at 'a'
+    in O(m log(n/m + 1)), reusing the nodes of 'a' and leaving 'b' intact.
+
+    With 'counted' True, multiset nodes only lose as many occurrences as
+    'b' holds. The recursion depth is bounded by the height of 'b'.
+
+    Returns the root of the difference.
+    '''
+    @staticmethod
+    def differenceNodes(a, b, monoid=None, counted=False):
+        if a is None:
+            return None
+        if b is None:
+            return a
+        aLeft, match, aRight = AvlTree.splitNodes(a, b.key, monoid)
+        left = AvlTree.differenceNodes(aLeft, b.left, monoid, counted)
+        right = AvlTree.differenceNodes(aRight, b.right, monoid, counted)
+        if match is not None and counted and match.count > b.count:
+            match.count = match.count - b.count
+            return AvlTree.joinNodes(left, match, right, monoid)
+        return AvlTree.joinTrees(left, right, monoid)
 
     '''
     Creates a new AvlTree self-balancing tree.
@@ -283,10 +894,54 @@ class AvlTree:
     Any given classFunc function must have the form:
         <TreeNode> clashFunc(<any> data, <TreeNode> node)
     Otherwise the insertion method would break.
+
+    Giving an associative combineFunc and its identity makes every node
+    keep the aggregate of its subtree, see the aggregate method. The
+    optional measureFunc maps data to the combined value:
+        <any> combineFunc(<any> leftValue, <any> rightValue)
+        <any> measureFunc(<any> data)
+
+    The optional keyFunc maps data to the key it is ordered by. The key is
+    computed once on insert and kept in the TreeNode, so only keys are
+    ever compared. With a keyFunc, insert and add take data while every
+    lookup (remove, search, in, rank, count, occurrences, aggregate,
+    irange) takes a key:
+        <any> keyFunc(<any> data)
+
+    With 'multiset' True, inserting existing data counts one more
+    occurrence in its TreeNode instead of calling a clashFunc, so memory
+    stays proportional to the distinct data. The first inserted data is
+    the one kept. Sizes, ranks, aggregates and iteration then take every
+    occurrence into account.
+
+    With 'finger' True, the Tree remembers the path to the last node that
+    insert or search reached, and the next insert or search starts from
+    the deepest node of that path whose key range holds the new key. For
+    sorted or clustered keys a search then only walks O(log d) nodes, d
+    being the distance between consecutive keys. An insert still refreshes
+    the sizes and heights up to the root.
+
+    Raises a ValueError if both multiset and a clashFunc are given.
     '''
-    def __init__(self, clashFunc=None, addFunc=None):
+    def __init__(self, clashFunc=None, addFunc=None, combineFunc=None, identity=None, measureFunc=None, keyFunc=None, multiset=False, finger=False):
         self.root = None
-        if clashFunc == None:
+        self.keyFunc = keyFunc
+        self.multiset = multiset
+        if finger:
+            # parallel lists of the path nodes and the exclusive bounds of
+            # their key ranges, None meaning unbounded
+            self.finger = ([], [], [])
+        else:
+            self.finger = None
+        if combineFunc == None:
+            self.monoid = None
+        else:
+            self.monoid = Monoid(combineFunc, identity, measureFunc)
+        if multiset:
+            if not clashFunc == None:
+                raise ValueError("a multiset AvlTree counts clashes and takes no clashFunc")
+            self.clash = AvlTree.countClash
+        elif clashFunc == None:
             self.clash = AvlTree.defaultClash
         else:
             self.clash = clashFunc
@@ -295,24 +950,192 @@ class AvlTree:
         else:
             self.addFunc = addFunc
 
+    '''
+    Creates a new AvlTree from an iterable that is already sorted
+    from smallest to largest, in O(n).
+
+    Equal consecutive items are resolved with clashFunc exactly as insert
+    would, and addFunc is applied to every item that creates a node. Any
+    keyword arguments are passed on to the constructor.
+
+    Raises a ValueError if the iterable is not sorted.
+    '''
+    @classmethod
+    def fromSorted(cls, iterable, **treeArgs):
+        tree = cls(**treeArgs)
+        clash = tree.clash
+        addFunc = tree.addFunc
+        keyFunc = tree.keyFunc
+        nodes = []
+        prev = None
+        for data in iterable:
+            key = data if keyFunc is None else keyFunc(data)
+            if nodes:
+                if key < prev:
+                    raise ValueError(f"fromSorted expected sorted data, but got {key} after {prev}")
+                elif not key > prev:
+                    # key == prev
+                    nodes[-1] = clash(data, nodes[-1])
+                    continue
+            nodes.append(TreeNode(addFunc(data), key=key))
+            prev = key
+        tree.root = AvlTree.buildBalanced(nodes, tree.monoid)
+        return tree
+
+    '''
+    Creates a new AvlTree from any iterable in O(n log n), or O(n) if
+    'presorted' is True.
+
+    See fromSorted for how duplicates are handled. Any keyword arguments
+    are passed on to the constructor.
+    '''
+    @classmethod
+    def fromIterable(cls, iterable, presorted=False, **treeArgs):
+        if not presorted:
+            iterable = sorted(iterable, key=treeArgs.get('keyFunc'))
+        return cls.fromSorted(iterable, **treeArgs)
+
+    '''
+    Gets what the neighbour queries (min, max, floor, ...) return for a
+    found TreeNode, its data for an AvlTree. None stays None.
+    '''
+    @staticmethod
+    def nodeResult(node):
+        if node is None:
+            return None
+        return node.data
+
+    '''
+    Forgets the finger path, after a change that may have restructured
+    the Tree without going through insert.
+    '''
+    def resetFinger(self):
+        if self.finger is not None:
+            nodes, los, his = self.finger
+            del nodes[:]
+            del los[:]
+            del his[:]
+
+    '''
+    Trims the finger path back to the deepest node whose key range holds
+    'key', starting it over from the root if the Tree has changed.
+
+    Returns the list of finger nodes, empty if the Tree is.
+    '''
+    def fingerStart(self, key):
+        nodes, los, his = self.finger
+        root = self.root
+        if not nodes or nodes[0] is not root:
+            self.resetFinger()
+            if root is not None:
+                nodes.append(root)
+                los.append(None)
+                his.append(None)
+            return nodes
+        i = len(nodes) - 1
+        while i > 0:
+            lo = los[i]
+            hi = his[i]
+            if (lo is None or lo < key) and (hi is None or key < hi):
+                break
+            i = i - 1
+        i = i + 1
+        del nodes[i:]
+        del los[i:]
+        del his[i:]
+        return nodes
+
+    '''
+    Finds the TreeNode with the given key starting from the finger path,
+    which is left ending at the last node reached.
+
+    Returns the TreeNode if found, None otherwise.
+    '''
+    def fingerSearch(self, key):
+        nodes, los, his = self.finger
+        if not self.fingerStart(key):
+            return None
+        node = nodes[-1]
+        lo = los[-1]
+        hi = his[-1]
+        while True:
+            nodeKey = node.key
+            if key < nodeKey:
+                hi = nodeKey
+                node = node.left
+            elif nodeKey < key:
+                lo = nodeKey
+                node = node.right
+            else:
+                return node
+            if node is None:
+                return None
+            nodes.append(node)
+            los.append(lo)
+            his.append(hi)
+
+    '''
+    Adds the data under 'key', resolving an existing key with 'clash'.
+    With a finger the walk starts from the finger path, which insertIterative
+    extends and rebalancePath cuts back at a rotation.
+    '''
+    def insertKey(self, data, key, clash):
+        if self.finger is None:
+            self.root = AvlTree.insertIterative(data, self.root, clash, self.addFunc, self.monoid, key)
+            return
+        nodes, los, his = self.finger
+        if not self.fingerStart(key):
+            self.root = AvlTree.insertIterative(data, None, clash, self.addFunc, self.monoid, key)
+            return
+        start = len(nodes)
+        self.root = AvlTree.insertIterative(data, self.root, clash, self.addFunc, self.monoid, key, nodes)
+        count = len(nodes)
+        if count < start:
+            del los[count:]
+            del his[count:]
+            return
+        # bounds of the nodes walked by this insert
+        i = start
+        while i < count:
+            parent = nodes[i - 1]
+            if parent.left is nodes[i]:
+                los.append(los[i - 1])
+                his.append(parent.key)
+            else:
+                los.append(parent.key)
+                his.append(his[i - 1])
+            i = i + 1
+
     '''
         Adds a new node with the given data to the Tree. 
     '''
     def insert(self, data):
+        key = data if self.keyFunc is None else self.keyFunc(data)
+        self.insertKey(data, key, self.clash)
+
+    '''
+    Removes a node with the given data, or key, from the Tree.
+
+    In a multiset only one occurrence is removed.
+    '''
+    def remove(self, data):
         if self.root == None:
-            self.root = TreeNode(data)
+            return None
         else:
-            self.root = AvlTree.insertRecursive(data, self.root, self.clash, self.addFunc)
+            self.resetFinger()
+            self.root = AvlTree.removeIterative(data, self.root, self.monoid)
 
     '''
-    Removes a node with the given data from the Tree
+    Removes the node with the given data, or key, from the Tree along
+    with all of its occurrences.
     '''
-    def remove(self, data):
+    def removeAll(self, data):
         if self.root == None:
             return None
         else:
-            self.root = AvlTree.removeRecursive(data, self.root)
-        
+            self.resetFinger()
+            self.root = AvlTree.removeIterative(data, self.root, self.monoid, True)
+
     '''
     Alias for the insert method
     '''
@@ -320,9 +1143,11 @@ class AvlTree:
         self.insert(data)
 
     '''
-    Finds a node in the Tree with the given data
+    Finds a node in the Tree with the given data, or key
     '''
     def search(self, data):
+        if self.finger is not None:
+            return self.fingerSearch(data)
         return TreeNode.getChildNode(data, self.root)
 
     '''
@@ -335,6 +1160,238 @@ class AvlTree:
         else:
             return True
 
+    '''
+    Gets the smallest data of the Tree in O(log n), None if it is empty.
+    '''
+    def min(self):
+        return self.nodeResult(TreeNode.getLeftMost(self.root))
+
+    '''
+    Gets the largest data of the Tree in O(log n), None if it is empty.
+    '''
+    def max(self):
+        return self.nodeResult(TreeNode.getRightMost(self.root))
+
+    '''
+    Gets the data with the largest key at most 'key' in O(log n),
+    None if there is none.
+    '''
+    def floor(self, key):
+        return self.nodeResult(TreeNode.getFloor(key, self.root))
+
+    '''
+    Gets the data with the smallest key at least 'key' in O(log n),
+    None if there is none.
+    '''
+    def ceiling(self, key):
+        return self.nodeResult(TreeNode.getCeiling(key, self.root))
+
+    '''
+    Gets the data with the largest key strictly smaller than 'key' in
+    O(log n), None if there is none.
+    '''
+    def lower(self, key):
+        return self.nodeResult(TreeNode.getFloor(key, self.root, False))
+
+    '''
+    Gets the data with the smallest key strictly larger than 'key' in
+    O(log n), None if there is none.
+    '''
+    def higher(self, key):
+        return self.nodeResult(TreeNode.getCeiling(key, self.root, False))
+
+    '''
+    Gets the number of nodes in the Tree in O(1), counting every
+    occurrence in a multiset.
+    '''
+    def __len__(self):
+        return TreeNode.getSize(self.root)
+
+    '''
+    Gets the number of nodes in the Tree with data smaller than 'data',
+    in O(log n). 'data' does not need to be in the Tree.
+    '''
+    def rank(self, data):
+        rank = 0
+        node = self.root
+        while node is not None:
+            if node.key < data:
+                left = node.left
+                rank = rank + (node.count if left is None else left.size + node.count)
+                node = node.right
+            else:
+                node = node.left
+        return rank
+
+    '''
+    Gets the data at position 'index' of the in-order list of the Tree,
+    in O(log n). Negative indices count from the largest.
+
+    Raises an IndexError if the index is out of range.
+    '''
+    def select(self, index):
+        size = len(self)
+        if index < 0:
+            index = index + size
+        if index < 0 or index >= size:
+            raise IndexError(f"AvlTree index {index} out of range for size {size}")
+        node = self.root
+        while True:
+            left = node.left
+            leftSize = 0 if left is None else left.size
+            if index < leftSize:
+                node = left
+            elif index < leftSize + node.count:
+                return node.data
+            else:
+                index = index - leftSize - node.count
+                node = node.right
+
+    '''
+    Counts the data in the half-open range [lo, hi) in O(log n).
+
+    A bound of None is unbounded on that side.
+    '''
+    def count(self, lo, hi):
+        hiRank = len(self) if hi is None else self.rank(hi)
+        loRank = 0 if lo is None else self.rank(lo)
+        return max(0, hiRank - loRank)
+
+    '''
+    Counts the occurrences of the given data, or key, in O(log n), which
+    is 0 or 1 outside of a multiset.
+    '''
+    def occurrences(self, data):
+        node = TreeNode.getChildNode(data, self.root)
+        return 0 if node is None else node.count
+
+    '''
+    Combines the measured values of the data in the half-open range
+    [lo, hi), in order, in O(log n). A bound of None is unbounded on
+    that side, so aggregate() covers the whole Tree.
+
+    Returns the identity for an empty range.
+    Raises a ValueError if the Tree was created without a combineFunc.
+    '''
+    def aggregate(self, lo=None, hi=None):
+        monoid = self.monoid
+        if monoid is None:
+            raise ValueError("aggregate requires the AvlTree to be created with a combineFunc")
+        combine = monoid.combine
+        # find the highest node inside the range, everything in range
+        # is in its subtree
+        node = self.root
+        while node is not None:
+            key = node.key
+            if lo is not None and key < lo:
+                node = node.right
+            elif hi is not None and not key < hi:
+                node = node.left
+            else:
+                break
+        if node is None:
+            return monoid.identity
+        result = monoid.nodeValue(node)
+        # left boundary: whole right subtrees of in-range nodes are included
+        cur = node.left
+        while cur is not None:
+            if lo is None or not cur.key < lo:
+                value = monoid.nodeValue(cur)
+                if cur.right is not None:
+                    value = combine(value, cur.right.agg)
+                result = combine(value, result)
+                if lo is None:
+                    if cur.left is not None:
+                        result = combine(cur.left.agg, result)
+                    break
+                cur = cur.left
+            else:
+                cur = cur.right
+        # right boundary: whole left subtrees of in-range nodes are included
+        cur = node.right
+        while cur is not None:
+            if hi is None or cur.key < hi:
+                value = monoid.nodeValue(cur)
+                if cur.left is not None:
+                    value = combine(cur.left.agg, value)
+                result = combine(result, value)
+                if hi is None:
+                    if cur.right is not None:
+                        result = combine(result, cur.right.agg)
+                    break
+                cur = cur.right
+            else:
+                cur = cur.left
+        return result
+
+    '''
+    Override for positional indexing, an alias of select.
+    '''
+    def __getitem__(self, index):
+        if not isinstance(index, int):
+            raise TypeError(f"AvlTree indices must be integers, not {type(index)}")
+        return self.select(index)
+
+    '''
+    Lazily iterates over the data of the Tree from smallest to largest,
+    holding only the O(log n) nodes of the current path. Every
+    occurrence in a multiset is yielded.
+
+    The Tree must not be modified while iterating.
+    '''
+    def __iter__(self):
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                data = node.data
+                yield data
+                count = node.count
+                while count > 1:
+                    yield data
+                    count = count - 1
+                node = node.right
+
+    '''
+    Lazily iterates over the data of the Tree from largest to smallest.
+    '''
+    def __reversed__(self):
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.right
+            else:
+                node = stack.pop()
+                data = node.data
+                yield data
+                count = node.count
+                while count > 1:
+                    yield data
+                    count = count - 1
+                node = node.left
+
+    '''
+    Lazily iterates, from smallest to largest, over the data between
+    'lo' and 'hi' in O(log n + k) for k results.
+
+    A bound of None is unbounded on that side. 'inclusive' is a pair of
+    booleans telling whether lo and hi themselves are part of the range.
+    '''
+    def irange(self, lo=None, hi=None, inclusive=(True, True)):
+        for node in TreeNode.inRange(self.root, lo, hi, inclusive):
+            data = node.data
+            yield data
+            count = node.count
+            while count > 1:
+                yield data
+                count = count - 1
+
     '''
     Creates an ordered list from smallest to largests
     '''
@@ -346,3 +1403,331 @@ class AvlTree:
     '''
     def generateSet(self):
         return set(self.generateList())
+
+    '''
+    Creates an immutable FrozenAvlTree holding the current keys and data
+    in contiguous arrays, in O(n), or a FrozenAvlMap for an AvlMap.
+    Multiset occurrences are repeated.
+    '''
+    def freeze(self):
+        keys = []
+        data = []
+        sameData = True
+        for node in TreeNode.inOrder(self.root):
+            count = node.count
+            while count > 0:
+                keys.append(node.key)
+                data.append(node.data)
+                count = count - 1
+            if node.data is not node.key:
+                sameData = False
+        keys = FrozenAvlTree.packItems(keys)
+        if sameData:
+            return self.frozenTree(keys)
+        return self.frozenTree(keys, FrozenAvlTree.packItems(data))
+
+    '''
+    Creates an empty Tree sharing the configuration (clashFunc, addFunc,
+    aggregate, keyFunc and multiset mode) of this one.
+    '''
+    def emptyCopy(self):
+        tree = copy.copy(self)
+        tree.root = None
+        if self.finger is not None:
+            tree.finger = ([], [], [])
+        return tree
+
+    '''
+    Raises a ValueError if 'other' can not share nodes with this Tree.
+    '''
+    def checkCompatible(self, other):
+        if self.multiset != other.multiset or (self.monoid is None) != (other.monoid is None):
+            raise ValueError("AvlTrees must share their multiset and aggregate modes to be combined")
+
+    '''
+    Raises a ValueError if 'other' can not share nodes with this Tree, or
+    if 'key' does not lie between the keys of this Tree and the larger
+    keys of 'other', as join expects.
+    '''
+    def checkJoin(self, key, other):
+        self.checkCompatible(other)
+        lowerMax = TreeNode.getRightMost(self.root)
+        upperMin = TreeNode.getLeftMost(other.root)
+        if (lowerMax is not None and not lowerMax.key < key) or (upperMin is not None and not key < upperMin.key):
+            raise ValueError(f"join expected {key} to lie between the keys of both Trees")
+
+    '''
+    Joins this Tree, the given data and the 'other' Tree into this Tree,
+    where all of this Tree's keys are smaller than the data's key and all
+    of the other's keys are larger, in O(log n). The nodes of 'other' are
+    reused, leaving it empty.
+
+    Raises a ValueError if the keys are not in that order.
+    '''
+    def join(self, data, other):
+        key = data if self.keyFunc is None else self.keyFunc(data)
+        self.joinNode(TreeNode(self.addFunc(data), key=key), other)
+
+    '''
+    Joins this Tree, a detached TreeNode and the 'other' Tree, see join.
+    '''
+    def joinNode(self, node, other):
+        self.checkJoin(node.key, other)
+        if self.monoid is not None:
+            self.monoid.update(node)
+        self.resetFinger()
+        other.resetFinger()
+        self.root = AvlTree.joinNodes(self.root, node, other.root, self.monoid)
+        other.root = None
+
+    '''
+    Splits this Tree around 'key' in O(log n), reusing its nodes and
+    leaving it empty. Splitting repeatedly shards a Tree into key ranges.
+
+    Returns a tuple (lower, upper) of new Trees with the same configuration,
+    holding the keys smaller than 'key' and the keys at least 'key'.
+    '''
+    def split(self, key):
+        monoid = self.monoid
+        left, node, right = AvlTree.splitNodes(self.root, key, monoid)
+        if node is not None:
+            right = AvlTree.joinNodes(None, node, right, monoid)
+        lower = self.emptyCopy()
+        lower.root = left
+        upper = self.emptyCopy()
+        upper.root = right
+        self.resetFinger()
+        self.root = None
+        return (lower, upper)
+
+    '''
+    Merges the 'other' Tree into this Tree in O(m log(n/m + 1)), m and n
+    being the smaller and larger sizes. The nodes of 'other' are reused,
+    leaving it empty. Keys found in both are resolved with this Tree's
+    clashFunc, or have their occurrences added up in a multiset.
+    '''
+    def union(self, other):
+        self.checkCompatible(other)
+        self.resetFinger()
+        other.resetFinger()
+        self.root = AvlTree.unionNodes(self.root, other.root, self.clash, self.monoid)
+        other.root = None
+
+    '''
+    Keeps only the keys of this Tree also found in the 'other' Tree,
+    in O(m log(n/m + 1)). The 'other' Tree is consumed and left empty.
+    A multiset keeps the smaller count of each key.
+    '''
+    def intersection(self, other):
+        self.checkCompatible(other)
+        self.resetFinger()
+        other.resetFinger()
+        self.root = AvlTree.intersectionNodes(self.root, other.root, self.monoid, self.multiset)
+        other.root = None
+
+    '''
+    Removes the keys of the 'other' Tree from this Tree in
+    O(m log(n/m + 1)), leaving 'other' unchanged. A multiset only loses
+    as many occurrences as 'other' holds.
+    '''
+    def difference(self, other):
+        self.checkCompatible(other)
+        self.resetFinger()
+        self.root = AvlTree.differenceNodes(self.root, other.root, self.monoid, self.multiset)
+
+'''
+Sorted map built on an AvlTree, mapping keys to values.
+
+The key is kept beside the value in each TreeNode, so only keys are ever
+compared and values need no ordering. Iterating a map yields its keys in
+order, like a dict.
+'''
+class AvlMap(AvlTree):
+
+    frozenTree = FrozenAvlMap
+
+    '''
+    Clash Resolution for a map, where the new value replaces the old one.
+    '''
+    @staticmethod
+    def replaceClash(data, root):
+        root.data = data
+        return root
+
+    '''
+    The neighbour queries (min, max, floor, ...) of a map return keys.
+    '''
+    @staticmethod
+    def nodeResult(node):
+        if node is None:
+            return None
+        return node.key
+
+    '''
+    Creates a new AvlMap.
+
+    Accepts the same optional parameters as AvlTree, except keyFunc, with
+    clashFunc defaulting to replacing the stored value.
+    '''
+    def __init__(self, clashFunc=None, addFunc=None, combineFunc=None, identity=None, measureFunc=None, finger=False):
+        if clashFunc == None:
+            clashFunc = AvlMap.replaceClash
+        super().__init__(clashFunc, addFunc, combineFunc, identity, measureFunc, finger=finger)
+
+    '''
+    Creates a new AvlMap from (key, value) pairs already sorted by key,
+    in O(n). Equal consecutive keys are resolved with clashFunc.
+
+    Raises a ValueError if the pairs are not sorted.
+    '''
+    @classmethod
+    def fromSorted(cls, iterable, **treeArgs):
+        tree = cls(**treeArgs)
+        clash = tree.clash
+        addFunc = tree.addFunc
+        nodes = []
+        prev = None
+        for key, value in iterable:
+            if nodes:
+                if key < prev:
+                    raise ValueError(f"fromSorted expected sorted keys, but got {key} after {prev}")
+                elif not key > prev:
+                    # key == prev
+                    nodes[-1] = clash(value, nodes[-1])
+                    continue
+            nodes.append(TreeNode(addFunc(value), key=key))
+            prev = key
+        tree.root = AvlTree.buildBalanced(nodes, tree.monoid)
+        return tree
+
+    '''
+    Creates a new AvlMap from any iterable of (key, value) pairs, or a
+    dict, in O(n log n), or O(n) if 'presorted' is True.
+    '''
+    @classmethod
+    def fromIterable(cls, iterable, presorted=False, **treeArgs):
+        if isinstance(iterable, dict):
+            iterable = iterable.items()
+        if not presorted:
+            # stable, so the clash sees equal keys in their original order
+            iterable = sorted(iterable, key=lambda item: item[0])
+        return cls.fromSorted(iterable, **treeArgs)
+
+    '''
+    Adds the value under the given key, resolving an existing key with
+    clashFunc.
+    '''
+    def insert(self, key, value):
+        self.insertKey(value, key, self.clash)
+
+    '''
+    Alias for the insert method
+    '''
+    def add(self, key, value):
+        self.insert(key, value)
+
+    '''
+    Joins this Map, the given key and value and the 'other' Map into this
+    Map, see AvlTree.join.
+    '''
+    def join(self, key, value, other):
+        self.joinNode(TreeNode(self.addFunc(value), key=key), other)
+
+    '''
+    Gets the value stored under 'key', or 'default' if there is none.
+    '''
+    def get(self, key, default=None):
+        node = self.search(key)
+        if node is None:
+            return default
+        return node.data
+
+    '''
+    Override for key lookup. Raises a KeyError if the key is missing.
+    '''
+    def __getitem__(self, key):
+        node = self.search(key)
+        if node is None:
+            raise KeyError(key)
+        return node.data
+
+    '''
+    Override for key assignment, always replacing an existing value.
+    '''
+    def __setitem__(self, key, value):
+        self.insertKey(value, key, AvlMap.replaceClash)
+
+    '''
+    Override for the 'del' keyword. Raises a KeyError if the key is missing.
+    '''
+    def __delitem__(self, key):
+        if TreeNode.getChildNode(key, self.root) is None:
+            raise KeyError(key)
+        self.remove(key)
+
+    '''
+    Removes 'key' and returns its value. If the key is missing, returns
+    'default' when given and raises a KeyError otherwise.
+    '''
+    def pop(self, key, *default):
+        node = TreeNode.getChildNode(key, self.root)
+        if node is None:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = node.data
+        self.remove(key)
+        return value
+
+    '''
+    Gets the value stored under 'key', first storing 'default' there if
+    the key is missing.
+    '''
+    def setdefault(self, key, default=None):
+        node = TreeNode.getChildNode(key, self.root)
+        if node is None:
+            self.insert(key, default)
+            return default
+        return node.data
+
+    '''
+    Lazily iterates over the keys of the Map from smallest to largest.
+    '''
+    def __iter__(self):
+        for node in TreeNode.inOrder(self.root):
+            yield node.key
+
+    '''
+    Lazily iterates over the keys of the Map from largest to smallest.
+    '''
+    def __reversed__(self):
+        for node in TreeNode.inOrder(self.root, True):
+            yield node.key
+
+    '''
+    Lazily iterates, from smallest to largest, over the keys between
+    'lo' and 'hi'. See AvlTree.irange for the bounds.
+    '''
+    def irange(self, lo=None, hi=None, inclusive=(True, True)):
+        for node in TreeNode.inRange(self.root, lo, hi, inclusive):
+            yield node.key
+
+    '''
+    Lazily iterates over the keys of the Map from smallest to largest.
+    '''
+    def keys(self):
+        return iter(self)
+
+    '''
+    Lazily iterates over the values of the Map in key order.
+    '''
+    def values(self):
+        for node in TreeNode.inOrder(self.root):
+            yield node.data
+
+    '''
+    Lazily iterates over the (key, value) pairs of the Map in key order.
+    '''
+    def items(self):
+        for node in TreeNode.inOrder(self.root):
+            yield (node.key, node.data)
@@ -0,0 +1,146 @@
+import math
+import random
+import sys
+import time
+
+from .avlTree import TreeNode
+from .avlTree import AvlTree
+
+'''
+Scaling benchmark of the AvlTree, timing insert, search and remove on
+shuffled int keys at growing sizes.
+
+For each size it reports the microseconds per operation, and the same
+time divided by log2 n in nanoseconds. With O(log n) operations the
+second set of columns stays roughly flat as n grows tenfold, up to
+the cache misses of a larger tree.
+
+The AvlTree is compared with RecursiveAvlTree, the recursive insert and
+remove it used to run on, with the same cached heights and rotations, to
+measure what the iterative path stack engine saves per operation.
+
+Run from the repository root, optionally with the largest number of keys:
+    python -m bst.avlTreeBenchmark [count]
+'''
+class AvlTreeBenchmark:
+
+    '''
+    Times one pass of 'operation' over the keys.
+
+    Returns the time per operation, in microseconds.
+    '''
+    @staticmethod
+    def timeOps(operation, keys):
+        start = time.perf_counter()
+        for key in keys:
+            operation(key)
+        return (time.perf_counter() - start) * 10**6 / len(keys)
+
+    '''
+    Fills a new Tree of the given class with the keys, then searches and
+    removes every one of them.
+
+    Raises a ValueError if a key is lost or left behind.
+
+    Returns a tuple of the microseconds per (insert, search, remove).
+    '''
+    @staticmethod
+    def measure(cls, keys):
+        tree = cls()
+        insertTime = AvlTreeBenchmark.timeOps(tree.insert, keys)
+        if len(tree) != len(keys):
+            raise ValueError(f"{cls.__name__} holds {len(tree)} keys, expected {len(keys)}")
+        searchTime = AvlTreeBenchmark.timeOps(tree.search, keys)
+        if tree.search(keys[-1]) is None:
+            raise ValueError(f"{cls.__name__} lost the key {keys[-1]}")
+        removeTime = AvlTreeBenchmark.timeOps(tree.remove, keys)
+        if len(tree) != 0:
+            raise ValueError(f"{cls.__name__} kept {len(tree)} keys after removing them all")
+        return (insertTime, searchTime, removeTime)
+
+    '''
+    Runs the benchmark on 1000 shuffled keys, then ten times as many up
+    to 'count', and prints a table.
+    '''
+    @staticmethod
+    def run(count=10**6):
+        print(f"{'':24} {'us per op':^26}  {'ns per op / log2 n':^26}")
+        print(f"{'':24} " + f"{'insert':>8} {'search':>8} {'remove':>8}  " * 2)
+        size = 1000
+        while size <= count:
+            keys = list(range(size))
+            random.Random(1).shuffle(keys)
+            levels = math.log2(size)
+            for cls in (AvlTree, RecursiveAvlTree):
+                times = AvlTreeBenchmark.measure(cls, keys)
+                label = f"{size} {cls.__name__}"
+                print(f"{label:24} " + " ".join(f"{op:8.2f}" for op in times) + "  " + " ".join(f"{op * 1000 / levels:8.0f}" for op in times))
+            size = size * 10
+        print(sys.version)
+
+'''
+AvlTree running the recursive insert and remove it had before the
+iterative engine, the baseline of the benchmark. Every level rebalances
+through AvlTree.balance, which refreshes the cached height and size.
+'''
+class RecursiveAvlTree(AvlTree):
+
+    '''
+    Recursive helper method for insertion.
+    '''
+    @staticmethod
+    def insertRecursive(key, root):
+        if root is None:
+            return TreeNode(key)
+        if key < root.key:
+            root.left = RecursiveAvlTree.insertRecursive(key, root.left)
+        elif key > root.key:
+            root.right = RecursiveAvlTree.insertRecursive(key, root.right)
+        else:
+            return root
+        return AvlTree.balance(root)
+
+    '''
+    Recursive helper method for removal.
+    '''
+    @staticmethod
+    def removeRecursive(key, root):
+        if root is None:
+            return None
+        if key < root.key:
+            root.left = RecursiveAvlTree.removeRecursive(key, root.left)
+        elif key > root.key:
+            root.right = RecursiveAvlTree.removeRecursive(key, root.right)
+        elif root.left is None:
+            return root.right
+        elif root.right is None:
+            return root.left
+        else:
+            successor = TreeNode.getLeftMost(root.right)
+            root.key = successor.key
+            root.data = successor.data
+            root.right = RecursiveAvlTree.removeRecursive(successor.key, root.right)
+        return AvlTree.balance(root)
+
+    '''
+    Recursive helper method for search.
+    '''
+    @staticmethod
+    def searchRecursive(key, root):
+        if root is None or key == root.key:
+            return root
+        if key < root.key:
+            return RecursiveAvlTree.searchRecursive(key, root.left)
+        return RecursiveAvlTree.searchRecursive(key, root.right)
+
+    def insert(self, data):
+        self.root = RecursiveAvlTree.insertRecursive(data, self.root)
+
+    def remove(self, data):
+        self.root = RecursiveAvlTree.removeRecursive(data, self.root)
+
+    def search(self, data):
+        return RecursiveAvlTree.searchRecursive(data, self.root)
+
+if __name__ == '__main__':
+    AvlTreeBenchmark.run(*[int(arg) for arg in sys.argv[1:]])
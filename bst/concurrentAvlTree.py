@@ -0,0 +1,168 @@
+try:
+    from ..general.readWriteLock import ReadWriteLock
+except ImportError:
+    # bst imported as a top level package, from the repository root
+    from general.readWriteLock import ReadWriteLock
+from .avlTree import AvlTree
+
+'''
+Thread-safe wrapper around an AvlTree, or any of its subclasses, guarded
+by a ReadWriteLock.
+
+Lookups and iteration hold the lock for reading, so they run alongside
+each other, while insert and remove hold it alone. Lookups return data,
+never TreeNodes, since a writer may change a node once the lock is
+released. Iterating copies the data under the lock first, so the loop
+body runs unlocked and may itself use the Tree.
+
+A Tree in finger mode changes its finger on every search, so its lookups
+hold the lock for writing instead.
+'''
+class ConcurrentAvlTree:
+
+    '''
+    Creates a new ConcurrentAvlTree around the given Tree, a new AvlTree
+    by default. The Tree must not be used directly afterwards, except
+    within readLocked or writeLocked.
+    '''
+    def __init__(self, tree=None):
+        if tree == None:
+            self.tree = AvlTree()
+        else:
+            self.tree = tree
+        self.lock = ReadWriteLock()
+        self.writing = self.lock.writeLocked()
+        if self.tree.finger is None:
+            self.reading = self.lock.readLocked()
+        else:
+            self.reading = self.writing
+
+    '''
+    Context manager holding the lock for reading, to run several lookups
+    on the wrapped Tree as one consistent batch:
+        with tree.readLocked():
+            tree.tree.floor(key) ...
+    '''
+    def readLocked(self):
+        return self.reading
+
+    '''
+    Context manager holding the lock for writing, see readLocked.
+    '''
+    def writeLocked(self):
+        return self.writing
+
+    '''
+    Write methods of the Tree, holding the lock alone.
+    '''
+
+    def insert(self, *args):
+        with self.writing:
+            self.tree.insert(*args)
+
+    def add(self, *args):
+        with self.writing:
+            self.tree.add(*args)
+
+    def remove(self, data):
+        with self.writing:
+            self.tree.remove(data)
+
+    def removeAll(self, data):
+        with self.writing:
+            self.tree.removeAll(data)
+
+    '''
+    Read methods of the Tree, holding the lock alongside other readers.
+    '''
+
+    '''
+    Finds the data stored under the given data, or key.
+
+    Returns the stored data if found, None otherwise.
+    '''
+    def search(self, data):
+        with self.reading:
+            node = self.tree.search(data)
+            if node is None:
+                return None
+            return node.data
+
+    def __contains__(self, data):
+        with self.reading:
+            return data in self.tree
+
+    def __len__(self):
+        with self.reading:
+            return len(self.tree)
+
+    def __getitem__(self, index):
+        with self.reading:
+            return self.tree[index]
+
+    def min(self):
+        with self.reading:
+            return self.tree.min()
+
+    def max(self):
+        with self.reading:
+            return self.tree.max()
+
+    def floor(self, key):
+        with self.reading:
+            return self.tree.floor(key)
+
+    def ceiling(self, key):
+        with self.reading:
+            return self.tree.ceiling(key)
+
+    def lower(self, key):
+        with self.reading:
+            return self.tree.lower(key)
+
+    def higher(self, key):
+        with self.reading:
+            return self.tree.higher(key)
+
+    def rank(self, data):
+        with self.reading:
+            return self.tree.rank(data)
+
+    def count(self, lo, hi):
+        with self.reading:
+            return self.tree.count(lo, hi)
+
+    def occurrences(self, data):
+        with self.reading:
+            return self.tree.occurrences(data)
+
+    def aggregate(self, lo=None, hi=None):
+        with self.reading:
+            return self.tree.aggregate(lo, hi)
+
+    '''
+    Lists the data between 'lo' and 'hi' under the lock, see AvlTree.irange.
+    '''
+    def irange(self, lo=None, hi=None, inclusive=(True, True)):
+        with self.reading:
+            return list(self.tree.irange(lo, hi, inclusive))
+
+    '''
+    Iterates over a copy of the data, from smallest to largest, taken
+    under the lock.
+    '''
+    def __iter__(self):
+        with self.reading:
+            return iter(list(self.tree))
+
+    def __reversed__(self):
+        with self.reading:
+            return iter(list(reversed(self.tree)))
+
+    def generateList(self):
+        with self.reading:
+            return self.tree.generateList()
+
+    def generateSet(self):
+        with self.reading:
+            return self.tree.generateSet()
@@ -0,0 +1,170 @@
+import random
+import sys
+import threading
+import time
+
+from .avlTree import TreeNode
+from .avlTree import AvlTree
+from .concurrentAvlTree import ConcurrentAvlTree
+
+'''
+Stress test and throughput benchmark of the ConcurrentAvlTree.
+
+The stress test runs 8 writer threads, inserting and removing keys of
+their own, against 8 reader threads that iterate and check the AVL
+invariants under the read lock, with and without a finger. The final
+contents must be exactly what the writers left.
+
+The benchmark compares the ReadWriteLock with a plain Lock around the
+same Tree for a 90% read workload.
+
+Run from the repository root:
+    python -m bst.concurrentAvlTreeStress
+'''
+class ConcurrentAvlTreeStress:
+
+    writers = 8
+    readers = 8
+    # keys inserted by each writer, every third one is removed again
+    writes = 3000
+    reads = 200
+    # apart from each other so that the writers never share a key
+    stride = 100000
+
+    '''
+    Raises a ValueError if the tree rooted at 'root' is not ordered, not
+    balanced, or has a stale cached height or size.
+    '''
+    @staticmethod
+    def checkInvariants(root):
+        prev = None
+        for node in TreeNode.inOrder(root):
+            if prev is not None and not prev.key < node.key:
+                raise ValueError(f"keys out of order: {prev.key} before {node.key}")
+            prev = node
+        preOrder = []
+        stack = [] if root is None else [root]
+        while stack:
+            node = stack.pop()
+            preOrder.append(node)
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+        # reversed, every child is checked before its parent
+        for node in reversed(preOrder):
+            leftHeight = TreeNode.getHeight(node.left)
+            rightHeight = TreeNode.getHeight(node.right)
+            if abs(leftHeight - rightHeight) > 1:
+                raise ValueError(f"node {node.key} is unbalanced: {leftHeight} against {rightHeight}")
+            if node.height != 1 + max(leftHeight, rightHeight):
+                raise ValueError(f"node {node.key} caches height {node.height}")
+            if node.size != node.count + TreeNode.getSize(node.left) + TreeNode.getSize(node.right):
+                raise ValueError(f"node {node.key} caches size {node.size}")
+
+    '''
+    Runs the writers against the readers on a ConcurrentAvlTree around
+    the given Tree.
+
+    Raises a ValueError if a reader sees a broken Tree, or if the final
+    contents are wrong.
+    '''
+    @staticmethod
+    def stress(tree):
+        stress = ConcurrentAvlTreeStress
+        concurrent = ConcurrentAvlTree(tree)
+        errors = []
+
+        def write(writer):
+            base = writer * stress.stride
+            for i in range(stress.writes):
+                concurrent.insert(base + i)
+                if i % 3 == 0 and i > 0:
+                    concurrent.remove(base + i - 3)
+
+        def read():
+            try:
+                for i in range(stress.reads):
+                    items = list(concurrent)
+                    if items != sorted(items):
+                        raise ValueError("iteration is out of order")
+                    with concurrent.readLocked():
+                        stress.checkInvariants(concurrent.tree.root)
+            except ValueError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=write, args=(writer,)) for writer in range(stress.writers)]
+        threads.extend(threading.Thread(target=read) for reader in range(stress.readers))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        stress.checkInvariants(concurrent.tree.root)
+        expected = set()
+        for writer in range(stress.writers):
+            base = writer * stress.stride
+            expected.update(base + i for i in range(stress.writes))
+            expected.difference_update(base + i for i in range(0, stress.writes - 3, 3))
+        if concurrent.generateSet() != expected:
+            raise ValueError(f"the Tree holds {len(concurrent)} keys, expected {len(expected)}")
+
+    '''
+    Runs 'total' operations, 90% lookups and 10% inserts, split between
+    'threads' threads.
+
+    Returns the throughput in operations per second.
+    '''
+    @staticmethod
+    def throughput(tree, threads, total=200000):
+        perThread = total // threads
+
+        def work(seed):
+            generator = random.Random(seed)
+            for i in range(perThread):
+                key = generator.randrange(200000)
+                if i % 10 == 0:
+                    tree.insert(key)
+                else:
+                    key in tree
+
+        workers = [threading.Thread(target=work, args=(seed,)) for seed in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return perThread * threads / (time.perf_counter() - start)
+
+    @staticmethod
+    def run():
+        for finger in (False, True):
+            ConcurrentAvlTreeStress.stress(AvlTree(finger=finger))
+            print(f"stress ok: {ConcurrentAvlTreeStress.writers} writers, {ConcurrentAvlTreeStress.readers} readers, finger={finger}")
+        print("90% reads, ops/s      Lock  ReadWriteLock")
+        for threads in (1, 4, 16):
+            locked = ConcurrentAvlTreeStress.throughput(LockedAvlTree(AvlTree.fromSorted(range(0, 200000, 2))), threads)
+            shared = ConcurrentAvlTreeStress.throughput(ConcurrentAvlTree(AvlTree.fromSorted(range(0, 200000, 2))), threads)
+            print(f"{threads:2} threads     {locked:12.0f} {shared:14.0f}")
+        print(sys.version)
+
+'''
+AvlTree behind a plain Lock, the baseline of the throughput benchmark.
+'''
+class LockedAvlTree:
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.lock = threading.Lock()
+
+    def insert(self, data):
+        with self.lock:
+            self.tree.insert(data)
+
+    def __contains__(self, data):
+        with self.lock:
+            return data in self.tree
+
+if __name__ == '__main__':
+    ConcurrentAvlTreeStress.run()
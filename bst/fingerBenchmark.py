@@ -0,0 +1,129 @@
+import random
+import sys
+import time
+
+from .avlTree import AvlTree
+
+'''
+Benchmark of the finger mode of the AvlTree, comparing the insert and
+search throughput, and the key comparisons per operation, of a Tree with
+and without a finger on sorted, nearly sorted and random int key streams.
+
+The nearly sorted stream moves every key of the sorted one by up to 8,
+the random stream samples keys from a range ten times as wide.
+
+Run from the repository root, optionally with the number of keys:
+    python -m bst.fingerBenchmark [count]
+'''
+class FingerBenchmark:
+
+    '''
+    Gets the three key streams of 'count' keys, as a list of
+    (name, keys) tuples.
+    '''
+    @staticmethod
+    def streams(count):
+        generator = random.Random(5)
+        return [
+            ('sorted', list(range(count))),
+            ('nearly sorted', [i + generator.randrange(-8, 9) for i in range(count)]),
+            ('random', generator.sample(range(10 * count), count)),
+        ]
+
+    '''
+    Times one pass of 'operation' over the keys.
+
+    Returns the throughput in operations per second.
+    '''
+    @staticmethod
+    def timeOps(operation, keys):
+        start = time.perf_counter()
+        for key in keys:
+            operation(key)
+        return len(keys) / (time.perf_counter() - start)
+
+    '''
+    Fills a new AvlTree, with or without a finger, with the keys, then
+    searches every one of them.
+
+    Returns a tuple (inserts/s, searches/s) and the Tree.
+    '''
+    @staticmethod
+    def measureRates(keys, finger):
+        tree = AvlTree(finger=finger)
+        insertRate = FingerBenchmark.timeOps(tree.insert, keys)
+        searchRate = FingerBenchmark.timeOps(tree.search, keys)
+        return (insertRate, searchRate), tree
+
+    '''
+    Counts the key comparisons per insert and per search of a Tree with or
+    without a finger, with the keys wrapped in CountedKey.
+
+    Returns a tuple (comparisons/insert, comparisons/search).
+    '''
+    @staticmethod
+    def measureComparisons(keys, finger):
+        keys = [CountedKey(key) for key in keys]
+        tree = AvlTree(finger=finger)
+        CountedKey.comparisons = 0
+        for key in keys:
+            tree.insert(key)
+        inserts = CountedKey.comparisons / len(keys)
+        CountedKey.comparisons = 0
+        for key in keys:
+            if tree.search(key) is None:
+                raise ValueError(f"finger={finger} lost the key {key.value}")
+        return (inserts, CountedKey.comparisons / len(keys))
+
+    '''
+    Runs the benchmark on streams of 'count' keys and prints a table.
+
+    Raises a ValueError if the Trees with and without a finger end up
+    holding different keys.
+    '''
+    @staticmethod
+    def run(count=100000):
+        print(f"{count} int keys per stream")
+        print(f"{'':24} {'insert/s':>10} {'search/s':>10} {'cmp/insert':>10} {'cmp/search':>10}")
+        for name, keys in FingerBenchmark.streams(count):
+            contents = []
+            for finger in (False, True):
+                rates, tree = FingerBenchmark.measureRates(keys, finger)
+                comparisons = FingerBenchmark.measureComparisons(keys, finger)
+                contents.append(list(tree))
+                label = f"{name}, {'finger' if finger else 'no finger'}"
+                print(f"{label:24} {rates[0]:10.0f} {rates[1]:10.0f} {comparisons[0]:10.1f} {comparisons[1]:10.1f}")
+            if contents[0] != contents[1]:
+                raise ValueError(f"the Trees with and without a finger differ on the {name} stream")
+        print(sys.version)
+
+'''
+Int key counting its comparisons in a class attribute, so that the
+benchmark can report how many nodes a walk visits.
+'''
+class CountedKey:
+
+    __slots__ = ('value',)
+    # comparisons made since the last reset
+    comparisons = 0
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        CountedKey.comparisons = CountedKey.comparisons + 1
+        return self.value < other.value
+
+    def __gt__(self, other):
+        CountedKey.comparisons = CountedKey.comparisons + 1
+        return self.value > other.value
+
+    def __eq__(self, other):
+        CountedKey.comparisons = CountedKey.comparisons + 1
+        return self.value == other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+if __name__ == '__main__':
+    FingerBenchmark.run(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,343 @@
+from array import array
+from bisect import bisect_left
+from bisect import bisect_right
+import mmap
+import struct
+
+'''
+Immutable, read-only snapshot of an AvlTree stored in contiguous arrays,
+created by AvlTree.freeze.
+
+The keys are kept in one sorted sequence, and the data in a parallel one
+when it differs from the keys (a keyFunc or an AvlMap). Every query is a
+binary search, so there is no per-node object at all. Integer and float
+sequences are packed with the array module, which is what allows saving
+to a file and loading it back through mmap: worker processes loading the
+same file share one copy of it in the page cache, with nothing to unpickle.
+'''
+class FrozenAvlTree:
+
+    fileMagic = b'FAVL'
+    fileVersion = 1
+    # magic, version, key typecode, data typecode (or a space), size
+    fileHeader = struct.Struct('<4sH1s1sQ')
+    # keeps the arrays 8 byte aligned after the header
+    fileHeaderSize = 24
+
+    '''
+    Packs 'items' into an array when they are all ints that fit in 64 bits,
+    or all floats, so they can be saved. Keeps them as a list otherwise.
+    No items are packed as an empty int array.
+    '''
+    @staticmethod
+    def packItems(items):
+        if all(type(item) is int for item in items):
+            try:
+                return array('q', items)
+            except OverflowError:
+                return list(items)
+        elif all(type(item) is float for item in items):
+            return array('d', items)
+        return list(items)
+
+    '''
+    Gets the typecode of a numeric array or memoryview, None otherwise.
+    '''
+    @staticmethod
+    def typecodeOf(items):
+        if isinstance(items, array):
+            return items.typecode
+        elif isinstance(items, memoryview):
+            return items.format
+        return None
+
+    '''
+    Creates a FrozenAvlTree from sorted keys and, optionally, the data
+    stored under each of them. Without data, the keys are the data.
+    '''
+    def __init__(self, keys, data=None):
+        self.sortedKeys = keys
+        self.data = keys if data is None else data
+        self.file = None
+        self.fileView = None
+
+    '''
+    Saves the Frozen Tree to 'path' in a format load can map back.
+
+    Raises a TypeError if the keys or data are not numeric arrays.
+    '''
+    def save(self, path):
+        keys = self.sortedKeys
+        data = self.data
+        keyCode = FrozenAvlTree.typecodeOf(keys)
+        if keyCode is None:
+            raise TypeError("only int or float keys can be saved")
+        if data is keys:
+            dataCode = ' '
+        else:
+            dataCode = FrozenAvlTree.typecodeOf(data)
+            if dataCode is None:
+                raise TypeError("only int or float data can be saved")
+        header = self.fileHeader.pack(self.fileMagic, self.fileVersion, keyCode.encode(), dataCode.encode(), len(keys))
+        with open(path, 'wb') as f:
+            f.write(header.ljust(self.fileHeaderSize, b'\0'))
+            f.write(keys if isinstance(keys, memoryview) else keys.tobytes())
+            if data is not keys:
+                f.write(data if isinstance(data, memoryview) else data.tobytes())
+
+    '''
+    Loads a Frozen Tree saved with save by mapping the file read-only,
+    without copying the arrays into the process.
+
+    Raises a ValueError if the file is not a saved Frozen Tree.
+    '''
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            fileMap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(fileMap)
+        try:
+            magic, version, keyCode, dataCode, size = cls.fileHeader.unpack_from(view)
+        except struct.error:
+            raise ValueError(f"{path} is not a saved FrozenAvlTree")
+        if magic != cls.fileMagic or version != cls.fileVersion:
+            raise ValueError(f"{path} is not a saved FrozenAvlTree")
+        start = cls.fileHeaderSize
+        keys = view[start:start + size * 8].cast(keyCode.decode())
+        data = None
+        if dataCode != b' ':
+            start = start + size * 8
+            data = view[start:start + size * 8].cast(dataCode.decode())
+        tree = cls(keys, data)
+        tree.file = fileMap
+        tree.fileView = view
+        return tree
+
+    '''
+    Releases the file mapping of a loaded Frozen Tree, which must not be
+    used afterwards.
+    '''
+    def close(self):
+        if self.file is not None:
+            self.sortedKeys.release()
+            if self.data is not self.sortedKeys:
+                self.data.release()
+            self.sortedKeys = self.data = None
+            self.fileView.release()
+            self.fileView = None
+            self.file.close()
+            self.file = None
+
+    '''
+    Gets the number of items in O(1).
+    '''
+    def __len__(self):
+        return len(self.sortedKeys)
+
+    '''
+    Finds the data stored under the given key in O(log n).
+
+    Returns the data if found, None otherwise.
+    '''
+    def search(self, key):
+        keys = self.sortedKeys
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            return self.data[index]
+        return None
+
+    '''
+    Gets the data stored under 'key', or 'default' if there is none.
+    '''
+    def get(self, key, default=None):
+        keys = self.sortedKeys
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            return self.data[index]
+        return default
+
+    '''
+    Override for the 'in' keyword.
+    '''
+    def __contains__(self, key):
+        keys = self.sortedKeys
+        index = bisect_left(keys, key)
+        return index < len(keys) and keys[index] == key
+
+    '''
+    Gets the data at 'index', or None if the index is out of range.
+    '''
+    def dataAt(self, index):
+        if 0 <= index < len(self.sortedKeys):
+            return self.data[index]
+        return None
+
+    '''
+    Gets what a neighbour query returns for the item at 'index', its data,
+    or None if the index is out of range.
+    '''
+    def resultAt(self, index):
+        return self.dataAt(index)
+
+    '''
+    Gets the smallest data, None if it is empty.
+    '''
+    def min(self):
+        return self.resultAt(0)
+
+    '''
+    Gets the largest data, None if it is empty.
+    '''
+    def max(self):
+        return self.resultAt(len(self.sortedKeys) - 1)
+
+    '''
+    Gets the data with the largest key at most 'key', None if there is none.
+    '''
+    def floor(self, key):
+        return self.resultAt(bisect_right(self.sortedKeys, key) - 1)
+
+    '''
+    Gets the data with the smallest key at least 'key', None if there is none.
+    '''
+    def ceiling(self, key):
+        return self.resultAt(bisect_left(self.sortedKeys, key))
+
+    '''
+    Gets the data with the largest key strictly smaller than 'key', None if
+    there is none.
+    '''
+    def lower(self, key):
+        return self.resultAt(bisect_left(self.sortedKeys, key) - 1)
+
+    '''
+    Gets the data with the smallest key strictly larger than 'key', None if
+    there is none.
+    '''
+    def higher(self, key):
+        return self.resultAt(bisect_right(self.sortedKeys, key))
+
+    '''
+    Gets the number of items with keys smaller than 'key' in O(log n).
+    '''
+    def rank(self, key):
+        return bisect_left(self.sortedKeys, key)
+
+    '''
+    Lazily iterates, from smallest to largest, over the data between 'lo'
+    and 'hi'. See AvlTree.irange for the bounds.
+    '''
+    def irange(self, lo=None, hi=None, inclusive=(True, True)):
+        data = self.data
+        for index in self.indexRange(lo, hi, inclusive):
+            yield data[index]
+
+    '''
+    Gets the range of the indices of the keys between 'lo' and 'hi'.
+    '''
+    def indexRange(self, lo, hi, inclusive):
+        keys = self.sortedKeys
+        if lo is None:
+            start = 0
+        elif inclusive[0]:
+            start = bisect_left(keys, lo)
+        else:
+            start = bisect_right(keys, lo)
+        if hi is None:
+            stop = len(keys)
+        elif inclusive[1]:
+            stop = bisect_right(keys, hi)
+        else:
+            stop = bisect_left(keys, hi)
+        return range(start, stop)
+
+    '''
+    Lazily iterates over the data from smallest to largest.
+    '''
+    def __iter__(self):
+        return iter(self.data)
+
+    '''
+    Lazily iterates over the data from largest to smallest.
+    '''
+    def __reversed__(self):
+        return reversed(self.data)
+
+    '''
+    Creates an ordered list from smallest to largests
+    '''
+    def generateList(self):
+        return list(self.data)
+
+    '''
+    Generates a set object from the Frozen Tree.
+    '''
+    def generateSet(self):
+        return set(self.data)
+
+'''
+Frozen snapshot of an AvlMap, created by AvlMap.freeze.
+
+As for the AvlMap, the neighbour queries (min, max, floor, ...), range
+scans and iteration return keys, while lookups return values. A saved
+map does not record that it is one, so it is loaded back with
+FrozenAvlMap.load.
+'''
+class FrozenAvlMap(FrozenAvlTree):
+
+    '''
+    The neighbour queries of a map return keys.
+    '''
+    def resultAt(self, index):
+        if 0 <= index < len(self.sortedKeys):
+            return self.sortedKeys[index]
+        return None
+
+    '''
+    Override for key lookup. Raises a KeyError if the key is missing.
+    '''
+    def __getitem__(self, key):
+        keys = self.sortedKeys
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            return self.data[index]
+        raise KeyError(key)
+
+    '''
+    Lazily iterates, from smallest to largest, over the keys between 'lo'
+    and 'hi'. See AvlTree.irange for the bounds.
+    '''
+    def irange(self, lo=None, hi=None, inclusive=(True, True)):
+        keys = self.sortedKeys
+        for index in self.indexRange(lo, hi, inclusive):
+            yield keys[index]
+
+    '''
+    Lazily iterates over the keys of the Map from smallest to largest.
+    '''
+    def __iter__(self):
+        return iter(self.sortedKeys)
+
+    '''
+    Lazily iterates over the keys of the Map from largest to smallest.
+    '''
+    def __reversed__(self):
+        return reversed(self.sortedKeys)
+
+    '''
+    Lazily iterates over the keys of the Map from smallest to largest.
+    '''
+    def keys(self):
+        return iter(self.sortedKeys)
+
+    '''
+    Lazily iterates over the values of the Map in key order.
+    '''
+    def values(self):
+        return iter(self.data)
+
+    '''
+    Lazily iterates over the (key, value) pairs of the Map in key order.
+    '''
+    def items(self):
+        return zip(self.sortedKeys, self.data)
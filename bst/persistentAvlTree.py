@@ -0,0 +1,454 @@
+from .avlTree import TreeNode
+from .avlTree import AvlTree
+from .avlTree import _NOKEY
+
+'''
+Persistent version of the AvlTree using path copying.
+
+An insert or remove never modifies a published TreeNode. It copies the
+O(log n) nodes on the path it changes, plus the few children a rotation
+touches, and shares every other node with the previous version. Taking a
+snapshot is therefore O(1), and readers can keep using an old version
+from other threads without locking while a single writer moves on.
+
+It takes the same optional parameters as AvlTree, and a clashFunc may
+modify the node it is given since that is always a copy. All of the
+AvlTree queries work on any version. The bulk operations (join, split,
+union, intersection, difference) copy only the spines they restructure,
+and leave the Trees they are given unchanged.
+'''
+class PersistentAvlTree(AvlTree):
+
+    '''
+    Copies the TreeNodes of 'path', a list of linked nodes from a root
+    downwards, and links the copies the same way.
+
+    Returns the list of copies.
+    '''
+    @staticmethod
+    def copyPath(path):
+        copies = []
+        for node in path:
+            newNode = TreeNode.copy(node)
+            if copies:
+                parent = copies[-1]
+                if parent.left is node:
+                    parent.left = newNode
+                else:
+                    parent.right = newNode
+            copies.append(newNode)
+        return copies
+
+    '''
+    Rebalances 'path', a list of freshly copied TreeNodes from the root
+    down, bottom up. Before a rotation the children it modifies are copied
+    too, so shared nodes are never changed.
+
+    Returns the new root.
+    '''
+    @staticmethod
+    def rebalanceCopies(path, monoid=None):
+        i = len(path) - 1
+        while i >= 0:
+            node = path[i]
+            balanceFactor = TreeNode.getHeight(node.left) - TreeNode.getHeight(node.right)
+            if balanceFactor > 1:
+                left = node.left = TreeNode.copy(node.left)
+                if TreeNode.getHeight(left.left) < TreeNode.getHeight(left.right):
+                    left.right = TreeNode.copy(left.right)
+            elif balanceFactor < -1:
+                right = node.right = TreeNode.copy(node.right)
+                if TreeNode.getHeight(right.right) < TreeNode.getHeight(right.left):
+                    right.left = TreeNode.copy(right.left)
+            newNode = AvlTree.balance(node, monoid)
+            if i == 0:
+                return newNode
+            if newNode is not node:
+                parent = path[i - 1]
+                if parent.left is node:
+                    parent.left = newNode
+                else:
+                    parent.right = newNode
+            i = i - 1
+        return None
+
+    '''
+    Path copying helper method for insertion.
+
+    Returns the root of the new version, or 'root' itself if nothing
+    changed.
+    '''
+    @staticmethod
+    def insertPersistent(data, root, clash=None, addFunc=None, monoid=None, key=_NOKEY):
+        if addFunc == None:
+            addFunc = AvlTree.defaultAddFunc
+        if key is _NOKEY:
+            key = data
+        if root is None:
+            leaf = TreeNode(addFunc(data), key=key)
+            if monoid is not None:
+                monoid.update(leaf)
+            return leaf
+        path = []
+        node = TreeNode.copy(root)
+        while True:
+            nodeKey = node.key
+            if key < nodeKey:
+                path.append(node)
+                if node.left is None:
+                    leaf = node.left = TreeNode(addFunc(data), key=key)
+                    break
+                node.left = TreeNode.copy(node.left)
+                node = node.left
+            elif key > nodeKey:
+                path.append(node)
+                if node.right is None:
+                    leaf = node.right = TreeNode(addFunc(data), key=key)
+                    break
+                node.right = TreeNode.copy(node.right)
+                node = node.right
+            else:
+                # key == node.key
+                if clash == None or clash is AvlTree.defaultClash:
+                    return root
+                # the clash only ever sees the copy
+                newNode = clash(data, node)
+                if path:
+                    parent = path[-1]
+                    if parent.left is node:
+                        parent.left = newNode
+                    else:
+                        parent.right = newNode
+                path.append(newNode)
+                return PersistentAvlTree.rebalanceCopies(path, monoid)
+        if monoid is not None:
+            monoid.update(leaf)
+        return PersistentAvlTree.rebalanceCopies(path, monoid)
+
+    '''
+    Path copying helper method for removal of the node with the given key.
+    See AvlTree.removeIterative for 'removeAll'.
+
+    Returns the root of the new version, or 'root' itself if the key is
+    not found.
+    '''
+    @staticmethod
+    def removePersistent(key, root, monoid=None, removeAll=False):
+        path = []
+        node = root
+        while node is not None:
+            nodeKey = node.key
+            if key < nodeKey:
+                path.append(node)
+                node = node.left
+            elif key > nodeKey:
+                path.append(node)
+                node = node.right
+            else:
+                break
+        if node is None:
+            # not found
+            return root
+        path.append(node)
+        targetIndex = len(path) - 1
+        if node.count > 1 and not removeAll:
+            copies = PersistentAvlTree.copyPath(path)
+            copies[-1].count = node.count - 1
+            return PersistentAvlTree.rebalanceCopies(copies, monoid)
+        if node.left is not None and node.right is not None:
+            # extend the path to the in-order successor
+            successor = node.right
+            while successor is not None:
+                path.append(successor)
+                successor = successor.left
+        copies = PersistentAvlTree.copyPath(path)
+        target = copies[targetIndex]
+        last = copies.pop()
+        if last is not target:
+            target.key = last.key
+            target.data = last.data
+            target.count = last.count
+        child = last.left if last.left is not None else last.right
+        if not copies:
+            return child
+        parent = copies[-1]
+        if parent.left is last:
+            parent.left = child
+        else:
+            parent.right = child
+        return PersistentAvlTree.rebalanceCopies(copies, monoid)
+
+    '''
+    Path copying version of AvlTree.joinNodes. 'node' must be a detached
+    node that is not shared, it is linked in place. The spine descended in
+    the taller tree is copied, and rebalanceCopies copies whatever a
+    rotation touches, so 'left' and 'right' are left unchanged.
+
+    Returns the root of the joined tree.
+    '''
+    @staticmethod
+    def joinPersistent(left, node, right, monoid=None):
+        leftHeight = 0 if left is None else left.height
+        rightHeight = 0 if right is None else right.height
+        if leftHeight > rightHeight + 1:
+            path = []
+            cur = left
+            while cur is not None and cur.height > rightHeight + 1:
+                path.append(cur)
+                cur = cur.right
+            copies = PersistentAvlTree.copyPath(path)
+            node.left = cur
+            node.right = right
+            TreeNode.update(node, monoid)
+            copies[-1].right = node
+            return PersistentAvlTree.rebalanceCopies(copies, monoid)
+        elif rightHeight > leftHeight + 1:
+            path = []
+            cur = right
+            while cur is not None and cur.height > leftHeight + 1:
+                path.append(cur)
+                cur = cur.left
+            copies = PersistentAvlTree.copyPath(path)
+            node.left = left
+            node.right = cur
+            TreeNode.update(node, monoid)
+            copies[-1].left = node
+            return PersistentAvlTree.rebalanceCopies(copies, monoid)
+        else:
+            node.left = left
+            node.right = right
+            TreeNode.update(node, monoid)
+            return node
+
+    '''
+    Path copying version of AvlTree.joinTrees, leaving 'left' and 'right'
+    unchanged.
+
+    Returns the root of the joined tree.
+    '''
+    @staticmethod
+    def joinTreesPersistent(left, right, monoid=None):
+        if left is None:
+            return right
+        if right is None:
+            return left
+        # detach a copy of the smallest node of right to join the trees around it
+        path = []
+        node = right
+        while node.left is not None:
+            path.append(node)
+            node = node.left
+        if path:
+            copies = PersistentAvlTree.copyPath(path)
+            copies[-1].left = node.right
+            right = PersistentAvlTree.rebalanceCopies(copies, monoid)
+        else:
+            right = node.right
+        return PersistentAvlTree.joinPersistent(left, TreeNode.copy(node), right, monoid)
+
+    '''
+    Path copying version of AvlTree.splitNodes, leaving the tree rooted at
+    'root' unchanged. Only the nodes on the search path are copied.
+
+    Returns a tuple (left, node, right) of the root of the keys smaller
+    than key, a detached copy of the node with the key (None if there is
+    none) and the root of the keys larger than key.
+    '''
+    @staticmethod
+    def splitPersistent(root, key, monoid=None):
+        path = []
+        node = root
+        while node is not None:
+            nodeKey = node.key
+            if key < nodeKey:
+                path.append((node, True))
+                node = node.left
+            elif nodeKey < key:
+                path.append((node, False))
+                node = node.right
+            else:
+                break
+        if node is None:
+            left = None
+            right = None
+        else:
+            left = node.left
+            right = node.right
+            node = TreeNode.copy(node)
+            node.left = None
+            node.right = None
+            TreeNode.update(node, monoid)
+        # unwind the path, every ancestor joins the side it was not descended into
+        for parent, wentLeft in reversed(path):
+            if wentLeft:
+                right = PersistentAvlTree.joinPersistent(right, TreeNode.copy(parent), parent.right, monoid)
+            else:
+                left = PersistentAvlTree.joinPersistent(parent.left, TreeNode.copy(parent), left, monoid)
+        return (left, node, right)
+
+    '''
+    Path copying version of AvlTree.unionNodes, leaving the trees rooted
+    at 'a' and 'b' unchanged. A clash only ever sees a copy of the node
+    of 'a'.
+
+    Returns the root of the union.
+    '''
+    @staticmethod
+    def unionPersistent(a, b, clash=None, monoid=None):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        bLeft, match, bRight = PersistentAvlTree.splitPersistent(b, a.key, monoid)
+        left = PersistentAvlTree.unionPersistent(a.left, bLeft, clash, monoid)
+        right = PersistentAvlTree.unionPersistent(a.right, bRight, clash, monoid)
+        node = TreeNode.copy(a)
+        if match is not None:
+            if clash is AvlTree.countClash:
+                node.count = node.count + match.count
+            elif not clash == None:
+                node = clash(match.data, node)
+        return PersistentAvlTree.joinPersistent(left, node, right, monoid)
+
+    '''
+    Path copying version of AvlTree.intersectionNodes, leaving the trees
+    rooted at 'a' and 'b' unchanged.
+
+    Returns the root of the intersection.
+    '''
+    @staticmethod
+    def intersectionPersistent(a, b, monoid=None, counted=False):
+        if a is None or b is None:
+            return None
+        bLeft, match, bRight = PersistentAvlTree.splitPersistent(b, a.key, monoid)
+        left = PersistentAvlTree.intersectionPersistent(a.left, bLeft, monoid, counted)
+        right = PersistentAvlTree.intersectionPersistent(a.right, bRight, monoid, counted)
+        if match is None:
+            return PersistentAvlTree.joinTreesPersistent(left, right, monoid)
+        node = TreeNode.copy(a)
+        if counted and match.count < node.count:
+            node.count = match.count
+        return PersistentAvlTree.joinPersistent(left, node, right, monoid)
+
+    '''
+    Path copying version of AvlTree.differenceNodes, leaving the trees
+    rooted at 'a' and 'b' unchanged.
+
+    Returns the root of the difference.
+    '''
+    @staticmethod
+    def differencePersistent(a, b, monoid=None, counted=False):
+        if a is None:
+            return None
+        if b is None:
+            return a
+        aLeft, match, aRight = PersistentAvlTree.splitPersistent(a, b.key, monoid)
+        left = PersistentAvlTree.differencePersistent(aLeft, b.left, monoid, counted)
+        right = PersistentAvlTree.differencePersistent(aRight, b.right, monoid, counted)
+        if match is not None and counted and match.count > b.count:
+            match.count = match.count - b.count
+            return PersistentAvlTree.joinPersistent(left, match, right, monoid)
+        return PersistentAvlTree.joinTreesPersistent(left, right, monoid)
+
+    '''
+    Adds a new node with the given data, making a new version.
+
+    Returns the root of the new version.
+    '''
+    def insert(self, data):
+        key = data if self.keyFunc is None else self.keyFunc(data)
+        self.root = PersistentAvlTree.insertPersistent(data, self.root, self.clash, self.addFunc, self.monoid, key)
+        return self.root
+
+    '''
+    Removes a node with the given data, or key, making a new version.
+    In a multiset only one occurrence is removed.
+
+    Returns the root of the new version.
+    '''
+    def remove(self, data):
+        self.root = PersistentAvlTree.removePersistent(data, self.root, self.monoid)
+        return self.root
+
+    '''
+    Removes the node with the given data, or key, along with all of its
+    occurrences, making a new version.
+
+    Returns the root of the new version.
+    '''
+    def removeAll(self, data):
+        self.root = PersistentAvlTree.removePersistent(data, self.root, self.monoid, True)
+        return self.root
+
+    '''
+    Gets a read-only view of the current version in O(1). Later inserts
+    and removes on this Tree do not affect the snapshot.
+
+    The snapshot never has a finger, even if this Tree does, since a
+    finger search updates the finger path and a snapshot is meant to be
+    read from many threads at once.
+    '''
+    def snapshot(self):
+        tree = self.emptyCopy()
+        tree.root = self.root
+        tree.finger = None
+        return tree
+
+    '''
+    Joins this Tree, a detached TreeNode and the 'other' Tree into a new
+    version of this Tree in O(log n), see AvlTree.join. Only the spine the
+    join descends is copied, the 'other' Tree is left unchanged and shares
+    its nodes with the result.
+
+    Raises a ValueError if the keys are not in order.
+    '''
+    def joinNode(self, node, other):
+        self.checkJoin(node.key, other)
+        if self.monoid is not None:
+            self.monoid.update(node)
+        self.root = PersistentAvlTree.joinPersistent(self.root, node, other.root, self.monoid)
+
+    '''
+    Splits the current version around 'key' in O(log n), copying only the
+    nodes on the search path and leaving this Tree unchanged.
+
+    Returns a tuple (lower, upper) of new Trees with the same configuration,
+    holding the keys smaller than 'key' and the keys at least 'key'.
+    '''
+    def split(self, key):
+        monoid = self.monoid
+        left, node, right = PersistentAvlTree.splitPersistent(self.root, key, monoid)
+        if node is not None:
+            right = PersistentAvlTree.joinPersistent(None, node, right, monoid)
+        lower = self.emptyCopy()
+        lower.root = left
+        upper = self.emptyCopy()
+        upper.root = right
+        return (lower, upper)
+
+    '''
+    Merges the 'other' Tree into a new version of this Tree in
+    O(m log(n/m + 1)), m and n being the smaller and larger sizes, see
+    AvlTree.union. The 'other' Tree is left unchanged.
+    '''
+    def union(self, other):
+        self.checkCompatible(other)
+        self.root = PersistentAvlTree.unionPersistent(self.root, other.root, self.clash, self.monoid)
+
+    '''
+    Keeps only the keys also found in the 'other' Tree in a new version of
+    this Tree, in O(m log(n/m + 1)), see AvlTree.intersection. The 'other'
+    Tree is left unchanged.
+    '''
+    def intersection(self, other):
+        self.checkCompatible(other)
+        self.root = PersistentAvlTree.intersectionPersistent(self.root, other.root, self.monoid, self.multiset)
+
+    '''
+    Removes the keys of the 'other' Tree in a new version of this Tree, in
+    O(m log(n/m + 1)), see AvlTree.difference. The 'other' Tree is left
+    unchanged.
+    '''
+    def difference(self, other):
+        self.checkCompatible(other)
+        self.root = PersistentAvlTree.differencePersistent(self.root, other.root, self.monoid, self.multiset)
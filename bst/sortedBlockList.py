@@ -0,0 +1,285 @@
+from bisect import bisect_left
+
+'''
+Sorted container keeping its data in a list of sorted blocks, offering the
+same public API as the AvlTree.
+
+Each block is a plain Python list of up to 2 * loadFactor items and a
+parallel list holds the largest item of every block. A lookup is then two
+binary searches (bisect) over contiguous lists instead of a pointer chase
+through one TreeNode per item, which costs far less memory per item and
+stays cache friendly at tens of millions of items. Inserting or removing
+shifts at most one block, which is cheap for blocks of this size.
+
+As in the AvlTree, the data is ordered by itself, not by what addFunc
+stores for it. With an addFunc, a second list of blocks keeps the data
+given to insert beside the stored data, and every lookup searches those.
+'''
+class SortedBlockList:
+
+    '''
+    Default number of items a block is split back down to.
+    '''
+    defaultLoadFactor = 1000
+
+    '''
+    Default Clash Resolution where data == existing, keeping the stored data.
+
+    Must return the data to store.
+    '''
+    @staticmethod
+    def defaultClash(data, existing):
+        return existing
+
+    @staticmethod
+    def defaultAddFunc(data):
+        return data
+
+    '''
+    Creates a new SortedBlockList. Every item is considered to be UNIQUE.
+
+    The optional clashFunc and addFunc parameters work as for the AvlTree,
+    except that clashFunc is given the stored data instead of a TreeNode:
+        <any> clashFunc(<any> data, <any> existing)
+
+    The optional loadFactor sets the block size, blocks are split once they
+    grow past twice of it.
+    '''
+    def __init__(self, clashFunc=None, addFunc=None, loadFactor=None):
+        self.blocks = []
+        self.maxes = []
+        self.length = 0
+        if clashFunc == None:
+            self.clash = SortedBlockList.defaultClash
+        else:
+            self.clash = clashFunc
+        if addFunc == None:
+            self.addFunc = SortedBlockList.defaultAddFunc
+            # the stored data is its own key
+            self.keys = self.blocks
+        else:
+            self.addFunc = addFunc
+            self.keys = []
+        if loadFactor == None:
+            self.loadFactor = SortedBlockList.defaultLoadFactor
+        else:
+            self.loadFactor = loadFactor
+
+    '''
+    Creates a new SortedBlockList from an iterable that is already sorted
+    from smallest to largest, in O(n). Equal consecutive items are resolved
+    with clashFunc. Any keyword arguments are passed on to the constructor.
+
+    Raises a ValueError if the iterable is not sorted.
+    '''
+    @classmethod
+    def fromSorted(cls, iterable, **listArgs):
+        container = cls(**listArgs)
+        clash = container.clash
+        addFunc = container.addFunc
+        items = []
+        keys = []
+        for data in iterable:
+            if keys:
+                prev = keys[-1]
+                if data < prev:
+                    raise ValueError(f"fromSorted expected sorted data, but got {data} after {prev}")
+                elif not data > prev:
+                    # data == prev
+                    items[-1] = clash(data, items[-1])
+                    continue
+            items.append(addFunc(data))
+            keys.append(data)
+        load = container.loadFactor
+        container.blocks[:] = [items[i:i + load] for i in range(0, len(items), load)]
+        if container.keys is not container.blocks:
+            container.keys[:] = [keys[i:i + load] for i in range(0, len(keys), load)]
+        container.maxes = [block[-1] for block in container.keys]
+        container.length = len(items)
+        return container
+
+    '''
+    Creates a new SortedBlockList from any iterable in O(n log n), or O(n)
+    if 'presorted' is True.
+    '''
+    @classmethod
+    def fromIterable(cls, iterable, presorted=False, **listArgs):
+        if not presorted:
+            iterable = sorted(iterable)
+        return cls.fromSorted(iterable, **listArgs)
+
+    '''
+    Gets the index of the block that would hold 'data', -1 if it is empty.
+    '''
+    def findBlock(self, data):
+        maxes = self.maxes
+        index = bisect_left(maxes, data)
+        if index == len(maxes):
+            index = index - 1
+        return index
+
+    '''
+    Adds the given data to the List.
+    '''
+    def insert(self, data):
+        blocks = self.blocks
+        keys = self.keys
+        if not blocks:
+            blocks.append([self.addFunc(data)])
+            if keys is not blocks:
+                keys.append([data])
+            self.maxes.append(keys[0][-1])
+            self.length = 1
+            return
+        index = self.findBlock(data)
+        block = blocks[index]
+        keyBlock = keys[index]
+        pos = bisect_left(keyBlock, data)
+        if pos < len(keyBlock) and keyBlock[pos] == data:
+            block[pos] = self.clash(data, block[pos])
+            return
+        block.insert(pos, self.addFunc(data))
+        if keyBlock is not block:
+            keyBlock.insert(pos, data)
+        self.maxes[index] = keyBlock[-1]
+        self.length = self.length + 1
+        if len(block) > 2 * self.loadFactor:
+            self.splitBlock(index)
+
+    '''
+    Splits an oversized block in two halves of loadFactor items.
+    '''
+    def splitBlock(self, index):
+        load = self.loadFactor
+        block = self.blocks[index]
+        self.blocks.insert(index + 1, block[load:])
+        del block[load:]
+        keys = self.keys
+        if keys is not self.blocks:
+            keyBlock = keys[index]
+            keys.insert(index + 1, keyBlock[load:])
+            del keyBlock[load:]
+        self.maxes[index] = keys[index][-1]
+        self.maxes.insert(index + 1, keys[index + 1][-1])
+
+    '''
+    Removes the given data from the List, if present.
+    '''
+    def remove(self, data):
+        blocks = self.blocks
+        if not blocks:
+            return None
+        keys = self.keys
+        mapped = keys is not blocks
+        index = self.findBlock(data)
+        block = blocks[index]
+        keyBlock = keys[index]
+        pos = bisect_left(keyBlock, data)
+        if pos == len(keyBlock) or not keyBlock[pos] == data:
+            return None
+        del block[pos]
+        if mapped:
+            del keyBlock[pos]
+        self.length = self.length - 1
+        if not block:
+            del blocks[index]
+            if mapped:
+                del keys[index]
+            del self.maxes[index]
+            return None
+        self.maxes[index] = keyBlock[-1]
+        if len(block) < self.loadFactor // 4 and len(blocks) > 1:
+            # merge an underfull block into its neighbour
+            if index == len(blocks) - 1:
+                index = index - 1
+            blocks[index].extend(blocks[index + 1])
+            del blocks[index + 1]
+            if mapped:
+                keys[index].extend(keys[index + 1])
+                del keys[index + 1]
+            del self.maxes[index + 1]
+            self.maxes[index] = keys[index][-1]
+            if len(blocks[index]) > 2 * self.loadFactor:
+                self.splitBlock(index)
+
+    '''
+    Alias for the insert method
+    '''
+    def add(self, data):
+        self.insert(data)
+
+    '''
+    Finds the stored data equal to the given data.
+
+    Returns the stored data if found, None otherwise.
+    '''
+    def search(self, data):
+        if not self.blocks:
+            return None
+        index = self.findBlock(data)
+        keyBlock = self.keys[index]
+        pos = bisect_left(keyBlock, data)
+        if pos < len(keyBlock) and keyBlock[pos] == data:
+            return self.blocks[index][pos]
+        return None
+
+    '''
+    Override for the 'in' keyword.
+    '''
+    def __contains__(self, data):
+        if not self.blocks:
+            return False
+        keyBlock = self.keys[self.findBlock(data)]
+        pos = bisect_left(keyBlock, data)
+        return pos < len(keyBlock) and keyBlock[pos] == data
+
+    '''
+    Gets the number of items in the List in O(1).
+    '''
+    def __len__(self):
+        return self.length
+
+    '''
+    Lazily iterates over the data from smallest to largest.
+    '''
+    def __iter__(self):
+        for block in self.blocks:
+            yield from block
+
+    '''
+    Lazily iterates over the data from largest to smallest.
+    '''
+    def __reversed__(self):
+        for block in reversed(self.blocks):
+            yield from reversed(block)
+
+    '''
+    Gets the smallest data of the List, None if it is empty.
+    '''
+    def min(self):
+        if not self.blocks:
+            return None
+        return self.blocks[0][0]
+
+    '''
+    Gets the largest data of the List, None if it is empty.
+    '''
+    def max(self):
+        if not self.blocks:
+            return None
+        return self.blocks[-1][-1]
+
+    '''
+    Creates an ordered list from smallest to largests
+    '''
+    def generateList(self):
+        retList = []
+        for block in self.blocks:
+            retList.extend(block)
+        return retList
+
+    '''
+    Generates a set object from the List.
+    '''
+    def generateSet(self):
+        return set(self.generateList())
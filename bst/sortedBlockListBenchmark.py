@@ -0,0 +1,82 @@
+import random
+import sys
+import time
+import tracemalloc
+
+from .avlTree import AvlTree
+from .sortedBlockList import SortedBlockList
+
+'''
+Side by side benchmark of the AvlTree and the SortedBlockList, reporting
+the memory per key, measured with tracemalloc, and the insert, search and
+remove throughput on shuffled int keys.
+
+Run from the repository root, optionally with the number of keys:
+    python -m bst.sortedBlockListBenchmark [count]
+'''
+class SortedBlockListBenchmark:
+
+    '''
+    Times one pass of 'operation' over the keys.
+
+    Returns the throughput in operations per second.
+    '''
+    @staticmethod
+    def timeOps(operation, keys):
+        start = time.perf_counter()
+        for key in keys:
+            operation(key)
+        return len(keys) / (time.perf_counter() - start)
+
+    '''
+    Measures the memory a container of the given class takes per key once
+    the keys are inserted, with tracemalloc.
+    '''
+    @staticmethod
+    def measureMemory(cls, keys):
+        tracemalloc.start()
+        container = cls()
+        for key in keys:
+            container.insert(key)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return memory / len(keys)
+
+    '''
+    Fills a new container of the given class with the keys, then searches
+    and removes every one of them.
+
+    Returns a tuple (inserts/s, searches/s, removes/s).
+    '''
+    @staticmethod
+    def measureRates(cls, keys):
+        container = cls()
+        insertRate = SortedBlockListBenchmark.timeOps(container.insert, keys)
+        if len(container) != len(keys):
+            raise ValueError(f"{cls.__name__} holds {len(container)} keys, expected {len(keys)}")
+        searchRate = SortedBlockListBenchmark.timeOps(container.search, keys)
+        removeRate = SortedBlockListBenchmark.timeOps(container.remove, keys)
+        if len(container) != 0:
+            raise ValueError(f"{cls.__name__} kept {len(container)} keys after removing them all")
+        return (insertRate, searchRate, removeRate)
+
+    '''
+    Runs the benchmark on 'count' shuffled keys and prints a table.
+
+    tracemalloc slows every allocation down, so the memory is measured on
+    a separate run over a tenth of the keys.
+    '''
+    @staticmethod
+    def run(count=10**6):
+        keys = list(range(count))
+        random.Random(12).shuffle(keys)
+        sample = keys[:max(1, count // 10)]
+        print(f"{count} shuffled int keys, memory measured on {len(sample)}")
+        print(f"{'':16} {'bytes/key':>9} {'insert/s':>10} {'search/s':>10} {'remove/s':>10}")
+        for cls in (AvlTree, SortedBlockList):
+            memory = SortedBlockListBenchmark.measureMemory(cls, sample)
+            insertRate, searchRate, removeRate = SortedBlockListBenchmark.measureRates(cls, keys)
+            print(f"{cls.__name__:16} {memory:9.0f} {insertRate:10.0f} {searchRate:10.0f} {removeRate:10.0f}")
+
+if __name__ == '__main__':
+    SortedBlockListBenchmark.run(*[int(arg) for arg in sys.argv[1:]])
@@ -1,2 +1,14 @@
 from .heap import MinHeap
 from .heap import MaxHeap
+from .heap import MinArrayHeap
+from .heap import MaxArrayHeap
+from .heap import BoundedMinHeap
+from .heap import BoundedMaxHeap
+from .heapQueue import HeapQueue
+from .readWriteLock import ReadWriteLock
+from .pairingHeap import MinPairingHeap
+from .pairingHeap import MaxPairingHeap
+from .bucketQueue import BucketQueue
+from .numpyHeap import MinNumpyHeap
+from .numpyHeap import MaxNumpyHeap
+from .timerQueue import TimerQueue
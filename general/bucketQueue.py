@@ -0,0 +1,103 @@
+from .heap import MinArrayHeap
+
+'''
+Min priority queue for small non-negative integer weights, keeping one
+bucket of data per weight instead of comparing items.
+
+It has the same add, next, peek and size interface as a MinHeap, so it
+can replace one whose weights are such integers, like indices to reuse.
+Adding is O(1). Extracting scans forward from the lowest weight that may
+hold data, so when the weights added never go below the last extracted
+one (a monotone queue, as in unit weight shortest paths) every operation
+is O(1) amortized.
+
+The scan never moves back. A weight added below it is also pushed to a
+small MinArrayHeap, once per bucket, so out of order weights cost
+O(log m) for m such buckets instead of a rescan of the empty buckets.
+
+Memory grows with the largest weight added, and is released whenever the
+queue empties.
+'''
+class BucketQueue:
+
+    def __init__(self):
+        self.buckets = []
+        self.lowest = 0
+        self.count = 0
+        # weights of the non empty buckets below lowest
+        self.below = MinArrayHeap()
+
+    '''
+    Gets the Size of the Queue.
+    '''
+    def size(self):
+        return self.count
+
+    '''
+    Performs an add operation on the Queue, in O(1), or O(log m) below
+    the scan.
+
+    Raises a TypeError if the weight is not an int, and a ValueError if
+    it is negative.
+    '''
+    def add(self, data, weight=0):
+        if type(weight) is not int:
+            raise TypeError(f"a BucketQueue weight must be an int, got {type(weight).__name__}")
+        if weight < 0:
+            raise ValueError(f"a BucketQueue weight must not be negative, got {weight}")
+        buckets = self.buckets
+        if weight >= len(buckets):
+            buckets.extend([] for _ in range(weight + 1 - len(buckets)))
+        if self.count == 0:
+            self.lowest = weight
+        elif weight < self.lowest and not buckets[weight]:
+            self.below.add(weight, weight)
+        buckets[weight].append(data)
+        self.count = self.count + 1
+
+    '''
+    Gets the lowest weight holding data, which must exist, moving the scan
+    forward to it when there is none below the scan.
+    '''
+    def findLowest(self):
+        if self.below.size() > 0:
+            return self.below.payloads[0]
+        buckets = self.buckets
+        lowest = self.lowest
+        while not buckets[lowest]:
+            lowest = lowest + 1
+        self.lowest = lowest
+        return lowest
+
+    '''
+    Gets the next element without extracting it, as (weight, data), or
+    None if the Queue is empty.
+    '''
+    def peek(self):
+        if self.count == 0:
+            return None
+        lowest = self.findLowest()
+        return (lowest, self.buckets[lowest][-1])
+
+    '''
+    Extracts the next element of the Queue. Equal weights come out in no
+    particular order.
+
+    Note: Elements are returned in the following format
+        (weight, data)
+
+    Returns the next element, (None, None) if the Queue is empty.
+    '''
+    def next(self):
+        if self.count == 0:
+            return (None, None)
+        lowest = self.findLowest()
+        bucket = self.buckets[lowest]
+        data = bucket.pop()
+        if not bucket and lowest < self.lowest:
+            self.below.next()
+        self.count = self.count - 1
+        if self.count == 0:
+            self.buckets = []
+            self.lowest = 0
+        return (lowest, data)
@@ -0,0 +1,147 @@
+import random
+import sys
+import time
+
+from .heap import MinHeap
+from .heap import MinArrayHeap
+from .bucketQueue import BucketQueue
+
+'''
+Benchmark of the BucketQueue against the MinHeap and the MinArrayHeap on
+three workloads:
+
+    Dijkstra's shortest paths on a random graph with small int weights,
+    where the queue is monotone and the BucketQueue scans each bucket once.
+
+    Recycling free slot indices, a random mix of add and next over
+    indices below a bound, as DirectedKeyGraph does with its unusedV.
+
+    Few items with weights spread sparsely over a wide range, where the
+    BucketQueue scans long runs of empty buckets and the heaps win.
+
+Run from the repository root, optionally with the number of vertices of
+the graph:
+    python -m general.bucketQueueBenchmark [vertices]
+'''
+class BucketQueueBenchmark:
+
+    queues = (MinHeap, MinArrayHeap, BucketQueue)
+    # edges per vertex of the random graph, and the largest edge weight
+    degree = 6
+    maxWeight = 9
+
+    '''
+    Gets a random directed graph with 'vertices' vertices, as a list of
+    the (target, weight) edges leaving each vertex.
+    '''
+    @staticmethod
+    def randomGraph(vertices, seed):
+        generator = random.Random(seed)
+        adjacency = [[] for i in range(vertices)]
+        for i in range(vertices * BucketQueueBenchmark.degree):
+            source = generator.randrange(vertices)
+            adjacency[source].append((generator.randrange(vertices), generator.randint(1, BucketQueueBenchmark.maxWeight)))
+        return adjacency
+
+    '''
+    Runs Dijkstra's algorithm from vertex 0 with a queue of the given
+    class, pushing every improved distance and skipping the stale ones.
+
+    Returns the list of distances, None for unreachable vertices.
+    '''
+    @staticmethod
+    def dijkstra(cls, adjacency):
+        distances = [None] * len(adjacency)
+        queue = cls()
+        queue.add(0, 0)
+        while queue.size() > 0:
+            distance, vertex = queue.next()
+            if distances[vertex] is not None:
+                continue
+            distances[vertex] = distance
+            for target, weight in adjacency[vertex]:
+                if distances[target] is None:
+                    queue.add(target, distance + weight)
+        return distances
+
+    '''
+    Times a run of dijkstra with every queue class.
+
+    Raises a ValueError if the queues do not find the same distances.
+
+    Returns the list of times, in seconds, in the order of queues.
+    '''
+    @staticmethod
+    def timeDijkstra(adjacency):
+        times = []
+        expected = None
+        for cls in BucketQueueBenchmark.queues:
+            start = time.perf_counter()
+            distances = BucketQueueBenchmark.dijkstra(cls, adjacency)
+            times.append(time.perf_counter() - start)
+            if expected is None:
+                expected = distances
+            elif distances != expected:
+                raise ValueError(f"{cls.__name__} found other distances than {BucketQueueBenchmark.queues[0].__name__}")
+        return times
+
+    '''
+    Times 'operations' random adds and nexts of slot indices below
+    'bound' with every queue class, each prefilled with half of the
+    indices, as a list of times in seconds in the order of queues.
+    '''
+    @staticmethod
+    def timeRecycling(bound, operations, seed):
+        times = []
+        for cls in BucketQueueBenchmark.queues:
+            generator = random.Random(seed)
+            free = list(range(bound))
+            generator.shuffle(free)
+            queue = cls()
+            start = time.perf_counter()
+            for index in free[:bound // 2]:
+                queue.add(index, index)
+            for i in range(operations):
+                if generator.random() < 0.5 and queue.size() > 0:
+                    queue.next()
+                else:
+                    index = generator.randrange(bound)
+                    queue.add(index, index)
+            times.append(time.perf_counter() - start)
+        return times
+
+    '''
+    Times adding then extracting 'count' items with random weights below
+    'bound' with every queue class, as a list of times in seconds in the
+    order of queues.
+    '''
+    @staticmethod
+    def timeSparse(count, bound, seed):
+        times = []
+        for cls in BucketQueueBenchmark.queues:
+            generator = random.Random(seed)
+            queue = cls()
+            start = time.perf_counter()
+            for i in range(count):
+                queue.add(i, generator.randrange(bound))
+            for i in range(count):
+                queue.next()
+            times.append(time.perf_counter() - start)
+        return times
+
+    @staticmethod
+    def run(vertices=50000):
+        benchmark = BucketQueueBenchmark
+        adjacency = benchmark.randomGraph(vertices, 23)
+        rows = [
+            (f"Dijkstra, {vertices} vertices", benchmark.timeDijkstra(adjacency)),
+            (f"recycling, {6 * vertices} ops", benchmark.timeRecycling(2 * vertices, 6 * vertices, 1)),
+            ("sparse, 2000 weights < 1e6", benchmark.timeSparse(2000, 10**6, 2)),
+        ]
+        print(f"{'':28} " + " ".join(f"{cls.__name__:>12}" for cls in benchmark.queues))
+        for name, times in rows:
+            print(f"{name:28} " + " ".join(f"{elapsed:11.3f}s" for elapsed in times))
+        print(sys.version)
+
+if __name__ == '__main__':
+    BucketQueueBenchmark.run(*[int(arg) for arg in sys.argv[1:]])
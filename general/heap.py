@@ -1,4 +1,5 @@
-import math
+from array import array
+import functools
 
 '''
 Created to allow for Heap Specific exceptions to be handled.
@@ -25,6 +26,11 @@ class HeapException(Exception):
 '''
 Represents a HeapNode. That is, a set of data with some weight or priority
 associated with it.
+
+A HeapNode is also the handle Heap.add returns, and keeps its index in
+the Heap's storage, None once it has left the Heap. HeapNodes are ordered
+by weight, but only equal to themselves, so that handles can be hashed
+into dicts and sets.
 '''
 class HeapNode:
 
@@ -34,6 +40,7 @@ class HeapNode:
     def __init__(self, data, weight):
         self.data = data
         self.weight = weight
+        self.index = None
 
     '''
     Returns the data held by this heap node.
@@ -46,6 +53,9 @@ class HeapNode:
     def getData(self):
         return (self.weight, self.data)
 
+    def getWeight(self):
+        return self.weight
+
     def __str__(self):
         return f"{self.weight}:{str(self.data)}"
 
@@ -65,12 +75,6 @@ class HeapNode:
     def __ge__(self, other):
         return self.weight >= other.weight
 
-    def __eq__(self, other):
-        try:
-            return self.weight == other.weight
-        except:
-            return False
-
 '''
 Base class for Heap Implemetation.
 
@@ -93,6 +97,13 @@ class Heap:
     def compareNodes(elem1, elem2):
         return False
 
+    '''
+    Tells popMany how a sort by weight matches compareNodes: False if the
+    lowest weights come first, True if the highest do, and None when
+    compareNodes does not order by weight alone.
+    '''
+    sortDescending = None
+
     '''
     Calls the class's static method for comparing.
     '''
@@ -101,25 +112,25 @@ class Heap:
         return cls.compareNodes(elem1, elem2)
 
     '''
-    Gets the Index of the Left Child.
+    Gets the Index of the Left Child, the first of 'arity' children.
     '''
     @staticmethod
-    def getLeftChild(index):
-        return index * 2
+    def getLeftChild(index, arity=2):
+        return arity * (index - 1) + 2
 
     '''
-    Gets the Index of the Right Child.
+    Gets the Index of the Right Child, the last of 'arity' children.
     '''
     @staticmethod
-    def getRightChild(index):
-        return (index * 2) + 1
+    def getRightChild(index, arity=2):
+        return arity * index + 1
 
     '''
     Gets the Index of the Parent.
     '''
     @staticmethod
-    def getParent(index):
-        return math.floor(index / 2)
+    def getParent(index, arity=2):
+        return (index - 2) // arity + 1
 
     '''
     Gets the Index of the Root.
@@ -130,9 +141,30 @@ class Heap:
 
     '''
     Constructor method for a heap.
+
+    The optional arity sets the number of children of every node, 2 for
+    a binary heap. A higher arity makes the heap shallower, so adds sift
+    up through fewer levels while each level of a removal compares more
+    children.
+
+    Raises a ValueError if the arity is smaller than 2.
     '''
-    def __init__(self):
+    def __init__(self, arity=2):
+        if arity < 2:
+            raise ValueError(f"a Heap needs an arity of at least 2, got {arity}")
         self.storage = [0]
+        self.arity = arity
+
+    '''
+    Creates a new Heap from an iterable of (data, weight) pairs, in the
+    order add takes them, in O(n) by heapifying bottom up. Any keyword
+    arguments are passed on to the constructor.
+    '''
+    @classmethod
+    def fromIterable(cls, pairs, **heapArgs):
+        heap = cls(**heapArgs)
+        heap.addMany(pairs)
+        return heap
 
     def peek(self):
         if len(self.storage) > self.__class__.getRootIndex():
@@ -169,6 +201,8 @@ class Heap:
                 tmp = self.storage[i]
                 self.storage[i] = self.storage[j]
                 self.storage[j] = tmp
+                self.storage[i].index = i
+                tmp.index = j
                 return True
             else:
                 return False
@@ -178,44 +212,259 @@ class Heap:
     '''
     Performs the Heapify functionality for retaining the heap property
     during an insertion, or add, function.
+
+    Moves a hole up from 'index' while the parent has a lower priority
+    than the node there, and drops the node into it.
     '''
     def heapifyUp(self, index):
-        parentIndex = Heap.getParent(index)
-        if self.swap(index, parentIndex):
-            return self.heapifyUp(parentIndex)
+        storage = self.storage
+        compare = self.compareNodes
+        node = storage[index]
+        arity = self.arity
+        root = Heap.getRootIndex()
+        if arity == 2:
+            while index > root:
+                parent = index // 2
+                parentNode = storage[parent]
+                if compare(node, parentNode):
+                    storage[index] = parentNode
+                    parentNode.index = index
+                    index = parent
+                else:
+                    break
         else:
-            return
+            while index > root:
+                parent = (index - 2) // arity + 1
+                parentNode = storage[parent]
+                if compare(node, parentNode):
+                    storage[index] = parentNode
+                    parentNode.index = index
+                    index = parent
+                else:
+                    break
+        storage[index] = node
+        node.index = index
 
     '''
     Performs the Heapify functionality for retaining the heap property
     during an deletion, or remove, function.
+
+    Moves a hole down from 'index' while its highest priority child has a
+    higher priority than the node there, and drops the node into it.
+    A node with fewer children than the arity is sifted as well.
     '''
     def heapifyDown(self, index):
-        leftChildIndex = Heap.getLeftChild(index)
-        rightChildIndex = Heap.getRightChild(index)
-        if self.inRange(leftChildIndex) and self.inRange(rightChildIndex):
-            if self.compare(self.storage[leftChildIndex], self.storage[rightChildIndex]):
-                # left child is the higher priority
-                if self.swap(leftChildIndex, index):
-                    return self.heapifyDown(leftChildIndex)
-                else:
-                    return
-            else:
-                # right child is the higher priority
-                if self.swap(rightChildIndex, index):
-                    return self.heapifyDown(rightChildIndex)
+        storage = self.storage
+        compare = self.compareNodes
+        arity = self.arity
+        size = storage[0]
+        node = storage[index]
+        child = arity * (index - 1) + 2
+        if arity == 2:
+            while child <= size:
+                childNode = storage[child]
+                right = child + 1
+                if right <= size:
+                    rightNode = storage[right]
+                    if compare(rightNode, childNode):
+                        child = right
+                        childNode = rightNode
+                if compare(childNode, node):
+                    storage[index] = childNode
+                    childNode.index = index
+                    index = child
+                    child = index * 2
                 else:
-                    return
+                    break
         else:
-            return
+            while child <= size:
+                childNode = storage[child]
+                last = child + arity - 1
+                if last > size:
+                    last = size
+                sibling = child + 1
+                while sibling <= last:
+                    siblingNode = storage[sibling]
+                    if compare(siblingNode, childNode):
+                        child = sibling
+                        childNode = siblingNode
+                    sibling = sibling + 1
+                if compare(childNode, node):
+                    storage[index] = childNode
+                    childNode.index = index
+                    index = child
+                    child = arity * (index - 1) + 2
+                else:
+                    break
+        storage[index] = node
+        node.index = index
 
     '''
     Performs an add operation on the Heap.
+
+    Returns the HeapNode holding the data, a handle for updatePriority,
+    remove and the 'in' keyword.
     '''
     def add(self, data, weight=0):
-        self.storage.append(HeapNode(data, weight))
+        node = HeapNode(data, weight)
+        self.storage.append(node)
         self.storage[0] = self.storage[0] + 1
         self.heapifyUp(self.size())
+        return node
+
+    '''
+    Adds every (data, weight) pair of the iterable to the Heap.
+
+    When the pairs at least double the size of the Heap, they are appended
+    as they are and the whole Heap is heapified bottom up in O(n) instead
+    of sifting each one up.
+
+    Returns the list of the added HeapNodes, see add.
+    '''
+    def addMany(self, pairs):
+        storage = self.storage
+        nodes = [HeapNode(data, weight) for data, weight in pairs]
+        size = storage[0]
+        if len(nodes) < size:
+            for node in nodes:
+                storage.append(node)
+                size = size + 1
+                storage[0] = size
+                self.heapifyUp(size)
+            return nodes
+        storage.extend(nodes)
+        size = size + len(nodes)
+        storage[0] = size
+        index = size
+        lastParent = (size - 2) // self.arity + 1
+        while index > lastParent:
+            storage[index].index = index
+            index = index - 1
+        while index >= Heap.getRootIndex():
+            self.heapifyDown(index)
+            index = index - 1
+        return nodes
+
+    '''
+    Extracts up to 'k' of the next elements of the Heap, or all of them
+    when 'k' is at least its size, in which case a single sort replaces
+    the sift passes.
+
+    Returns the list of the elements, in order, as (weight, data).
+    '''
+    def popMany(self, k):
+        storage = self.storage
+        size = storage[0]
+        if k >= size:
+            nodes = storage[Heap.getRootIndex():]
+            del storage[Heap.getRootIndex():]
+            storage[0] = 0
+            for node in nodes:
+                node.index = None
+            if self.sortDescending is None:
+                nodes.sort(key=functools.cmp_to_key(self.orderNodes))
+            else:
+                nodes.sort(key=HeapNode.getWeight, reverse=self.sortDescending)
+            return [node.getData() for node in nodes]
+        items = []
+        while k > 0:
+            items.append(self.next())
+            k = k - 1
+        return items
+
+    '''
+    Orders two HeapNodes for a sort, the higher priority first.
+    '''
+    @classmethod
+    def orderNodes(cls, elem1, elem2):
+        if cls.compareNodes(elem1, elem2):
+            return -1
+        elif cls.compareNodes(elem2, elem1):
+            return 1
+        return 0
+
+    '''
+    Adds the data with the given weight and extracts the next element,
+    with at most one sift pass. When the new data would be next itself,
+    the Heap is left untouched.
+
+    Returns a tuple (element, handle) of the next element, as
+    (weight, data), and the HeapNode of the added data, see add. That
+    handle is not in the Heap when the added data was extracted at once.
+    '''
+    def pushPop(self, data, weight=0):
+        node = HeapNode(data, weight)
+        storage = self.storage
+        root = Heap.getRootIndex()
+        if storage[0] <= 0 or not self.compareNodes(storage[root], node):
+            return (node.getData(), node)
+        item = storage[root]
+        storage[root] = node
+        self.heapifyDown(root)
+        item.index = None
+        return (item.getData(), node)
+
+    '''
+    Extracts the next element and adds the data with the given weight,
+    with a single sift pass. The returned element may have a lower
+    priority than the added data.
+
+    Returns a tuple (element, handle) of the extracted element, as
+    (weight, data) or (None, None) if the Heap was empty, and the HeapNode
+    of the added data, see add.
+    '''
+    def replace(self, data, weight=0):
+        storage = self.storage
+        if storage[0] <= 0:
+            return ((None, None), self.add(data, weight))
+        root = Heap.getRootIndex()
+        item = storage[root]
+        node = HeapNode(data, weight)
+        storage[root] = node
+        self.heapifyDown(root)
+        item.index = None
+        return (item.getData(), node)
+
+    '''
+    Lazily merges iterables that are each already sorted into one sorted
+    stream, holding only the current item of each iterable, so memory
+    stays proportional to their number.
+
+    The items are ordered by key(item), or by the items themselves, from
+    smallest to largest in a MinHeap, or largest to smallest in a MaxHeap
+    if 'reverse' is True. Equal items come out in the order of their
+    iterables.
+    '''
+    @staticmethod
+    def kWayMerge(iterables, key=None, reverse=False):
+        if reverse:
+            heap = MaxHeap()
+            order = -1
+        else:
+            heap = MinHeap()
+            order = 1
+        pairs = []
+        for rank, iterable in enumerate(iterables):
+            iterator = iter(iterable)
+            for item in iterator:
+                weight = item if key is None else key(item)
+                pairs.append(((item, iterator), (weight, order * rank)))
+                break
+        heap.addMany(pairs)
+        storage = heap.storage
+        root = Heap.getRootIndex()
+        while storage[0] > 0:
+            node = storage[root]
+            item, iterator = node.data
+            yield item
+            for item in iterator:
+                # refill the root from the same iterable and sift it down
+                node.data = (item, iterator)
+                node.weight = (item if key is None else key(item), node.weight[1])
+                heap.heapifyDown(root)
+                break
+            else:
+                heap.next()
 
     '''
     Extracts the next element of the Heap, ensuring the heap property is
@@ -231,14 +480,62 @@ class Heap:
             return (None, None)
         elif self.size() == 1:
             self.storage[0] = self.storage[0] - 1
-            return self.storage.pop(Heap.getRootIndex()).getData()
+            item = self.storage.pop(Heap.getRootIndex())
+            item.index = None
+            return item.getData()
         else:
             item = self.storage[Heap.getRootIndex()]
             self.storage[Heap.getRootIndex()] = self.storage.pop(self.size())
             self.storage[0] = self.storage[0] - 1
             self.heapifyDown(Heap.getRootIndex())
+            item.index = None
             return item.getData()
 
+    '''
+    Override for the 'in' keyword. True if the given handle, returned
+    by add, is still in this Heap.
+    '''
+    def __contains__(self, handle):
+        index = getattr(handle, 'index', None)
+        return index is not None and index <= self.size() and self.storage[index] is handle
+
+    '''
+    Changes the weight of the given handle, returned by add, and restores
+    the heap property in O(log n).
+
+    Raises a ValueError if the handle is not in this Heap.
+    '''
+    def updatePriority(self, handle, weight):
+        if handle not in self:
+            raise ValueError("updatePriority expected a handle in this Heap")
+        index = handle.index
+        handle.weight = weight
+        self.heapifyUp(index)
+        if handle.index == index:
+            self.heapifyDown(index)
+
+    '''
+    Removes the given handle, returned by add, from the Heap in O(log n).
+
+    Raises a ValueError if the handle is not in this Heap.
+
+    Returns the removed element as (weight, data).
+    '''
+    def remove(self, handle):
+        if handle not in self:
+            raise ValueError("remove expected a handle in this Heap")
+        index = handle.index
+        last = self.storage.pop(self.size())
+        self.storage[0] = self.storage[0] - 1
+        if last is not handle:
+            # fill the gap with the last node and sift it either way
+            self.storage[index] = last
+            self.heapifyUp(index)
+            if last.index == index:
+                self.heapifyDown(index)
+        handle.index = None
+        return handle.getData()
+
     def __str__(self):
         heapStr = ""
         for elem in self.storage:
@@ -261,6 +558,8 @@ class MinHeap(Heap):
     def compareNodes(elem1, elem2):
         return elem1 < elem2
 
+    sortDescending = False
+
 '''
 Implementation of a Max Heap
 '''
@@ -276,3 +575,213 @@ class MaxHeap(Heap):
     @staticmethod
     def compareNodes(elem1, elem2):
         return elem1 > elem2
+
+    sortDescending = True
+
+'''
+Base class for an array backed Heap, storing no HeapNode at all.
+
+The weights are kept as floats in a compact array('d') and the data in a
+parallel list, both indexed from 0, and the sift loops compare the raw
+weights inline while moving a hole instead of swapping. Weights must
+therefore be numbers, and are returned as floats.
+
+Every weight is stored multiplied by the class's sign, so that the
+smallest stored weight is always the one given the highest priority.
+'''
+class ArrayHeap:
+
+    sign = 1.0
+
+    def __init__(self):
+        self.weights = array('d')
+        self.payloads = []
+
+    '''
+    Gets the next element without extracting it, as (weight, data),
+    or None if the Heap is empty.
+    '''
+    def peek(self):
+        if self.weights:
+            return (self.sign * self.weights[0], self.payloads[0])
+        else:
+            return None
+
+    '''
+    Gets the Size of the Heap.
+    '''
+    def size(self):
+        return len(self.weights)
+
+    '''
+    Performs an add operation on the Heap, in O(log n).
+    '''
+    def add(self, data, weight=0):
+        weights = self.weights
+        payloads = self.payloads
+        weight = self.sign * weight
+        index = len(weights)
+        weights.append(weight)
+        payloads.append(data)
+        # move the hole up while the parent has a lower priority
+        while index > 0:
+            parent = (index - 1) >> 1
+            parentWeight = weights[parent]
+            if weight < parentWeight:
+                weights[index] = parentWeight
+                payloads[index] = payloads[parent]
+                index = parent
+            else:
+                break
+        weights[index] = weight
+        payloads[index] = data
+
+    '''
+    Extracts the next element of the Heap in O(log n).
+
+    Note: Elements are returned in the following format
+        (weight, data)
+
+    Returns the next element, (None, None) if the Heap is empty.
+    '''
+    def next(self):
+        weights = self.weights
+        payloads = self.payloads
+        size = len(weights)
+        if size == 0:
+            return (None, None)
+        topWeight = weights[0]
+        topData = payloads[0]
+        weight = weights.pop()
+        data = payloads.pop()
+        size = size - 1
+        if size > 0:
+            # move the hole at the root down, then fill it with the last element
+            index = 0
+            child = 1
+            while child < size:
+                childWeight = weights[child]
+                right = child + 1
+                if right < size:
+                    rightWeight = weights[right]
+                    if rightWeight < childWeight:
+                        child = right
+                        childWeight = rightWeight
+                if childWeight < weight:
+                    weights[index] = childWeight
+                    payloads[index] = payloads[child]
+                    index = child
+                    child = 2 * index + 1
+                else:
+                    break
+            weights[index] = weight
+            payloads[index] = data
+        return (self.sign * topWeight, topData)
+
+    def __str__(self):
+        heapStr = ""
+        for weight, data in zip(self.weights, self.payloads):
+            heapStr = heapStr + f"{self.sign * weight}:{str(data)}" + "\n"
+        return heapStr
+
+'''
+Implementation of an array backed Min Heap.
+'''
+class MinArrayHeap(ArrayHeap):
+
+    sign = 1.0
+
+'''
+Implementation of an array backed Max Heap, storing negated weights.
+'''
+class MaxArrayHeap(ArrayHeap):
+
+    sign = -1.0
+
+'''
+Base class for a Heap bounded to a fixed capacity, keeping only the
+'capacity' items of highest priority out of any number added, in O(K)
+memory for a capacity of K.
+
+The items are kept in an inner Heap ordered the opposite way, so that
+its root is the worst kept item. An incoming item that can not beat it
+is rejected with a single comparison, and one that does replaces it in
+place with a single sift pass.
+
+Should be overriden by a class that sets keptHeap, the class of the
+inner Heap.
+'''
+class BoundedHeap:
+
+    keptHeap = None
+
+    '''
+    Creates a new BoundedHeap keeping at most 'capacity' items. The
+    optional arity is passed on to the inner Heap.
+
+    Raises a ValueError if the capacity is smaller than 1.
+    '''
+    def __init__(self, capacity, arity=2):
+        if capacity < 1:
+            raise ValueError(f"a BoundedHeap needs a capacity of at least 1, got {capacity}")
+        self.capacity = capacity
+        self.heap = self.keptHeap(arity)
+        # reused to compare incoming weights without allocating
+        self.probe = HeapNode(None, None)
+
+    '''
+    Gets the worst kept item, the one the next better item replaces, as
+    a HeapNode, or None if it is empty.
+    '''
+    def peek(self):
+        return self.heap.peek()
+
+    '''
+    Gets the number of kept items.
+    '''
+    def size(self):
+        return self.heap.size()
+
+    '''
+    Offers the data with the given weight. While the capacity is not
+    reached it is always kept. After that it replaces the worst kept item
+    if it has a higher priority, and is rejected in O(1) otherwise.
+
+    Returns True if the data is kept, False if it is rejected.
+    '''
+    def add(self, data, weight=0):
+        heap = self.heap
+        if heap.storage[0] < self.capacity:
+            heap.add(data, weight)
+            return True
+        probe = self.probe
+        probe.weight = weight
+        if not heap.compareNodes(heap.storage[Heap.getRootIndex()], probe):
+            return False
+        heap.replace(data, weight)
+        return True
+
+    '''
+    Extracts every kept item, leaving the BoundedHeap empty.
+
+    Returns the list of the items as (weight, data), from highest to
+    lowest priority.
+    '''
+    def drain(self):
+        items = self.heap.popMany(self.heap.size())
+        items.reverse()
+        return items
+
+'''
+Bounded Heap keeping the items with the highest weights.
+'''
+class BoundedMaxHeap(BoundedHeap):
+
+    keptHeap = MinHeap
+
+'''
+Bounded Heap keeping the items with the lowest weights.
+'''
+class BoundedMinHeap(BoundedHeap):
+
+    keptHeap = MaxHeap
@@ -0,0 +1,76 @@
+import random
+import sys
+import time
+
+from .heap import MinHeap
+
+'''
+Arity sweep of the Heap, timing push heavy, balanced and pop heavy mixes
+of add and next on a MinHeap of every arity, so that the binary layout
+can be compared with the shallower d-ary ones.
+
+Each mix starts from a prefilled Heap, then runs the operations, and is
+timed at its best over a few repetitions.
+
+Run from the repository root, optionally with the number of operations
+per mix:
+    python -m general.heapArityBenchmark [operations]
+'''
+class HeapArityBenchmark:
+
+    arities = (2, 3, 4, 8, 16)
+    # (name, share of adds, prefilled items as a share of the operations)
+    mixes = (
+        ('push heavy 90/10', 0.9, 0.05),
+        ('balanced 50/50', 0.5, 0.5),
+        ('pop heavy 10/90', 0.1, 1.0),
+    )
+    repetitions = 3
+    # items extracted in order after each mix to check the Heap
+    checked = 1000
+
+    '''
+    Runs 'operations' adds and nexts on a MinHeap of the given arity,
+    prefilled with 'prefill' items, adding with probability 'addShare'.
+
+    Raises a ValueError if the first 'checked' items extracted afterwards
+    are not in order.
+
+    Returns the time of the operations, in seconds.
+    '''
+    @staticmethod
+    def timeMix(arity, addShare, prefill, operations, seed):
+        generator = random.Random(seed)
+        heap = MinHeap.fromIterable(((i, generator.random()) for i in range(prefill)), arity=arity)
+        weights = [generator.random() for i in range(operations)]
+        adds = [generator.random() < addShare for i in range(operations)]
+        start = time.perf_counter()
+        for weight, add in zip(weights, adds):
+            if add:
+                heap.add(None, weight)
+            else:
+                heap.next()
+        elapsed = time.perf_counter() - start
+        prev = None
+        for i in range(min(heap.size(), HeapArityBenchmark.checked)):
+            weight, data = heap.next()
+            if prev is not None and weight < prev:
+                raise ValueError(f"a MinHeap of arity {arity} extracted {weight} after {prev}")
+            prev = weight
+        return elapsed
+
+    @staticmethod
+    def run(operations=100000):
+        benchmark = HeapArityBenchmark
+        print(f"{operations} operations per mix, best of {benchmark.repetitions}")
+        print(f"{'':17} " + " ".join(f"{'d=' + str(arity):>7}" for arity in benchmark.arities))
+        for name, addShare, prefillShare in benchmark.mixes:
+            prefill = int(operations * prefillShare)
+            times = []
+            for arity in benchmark.arities:
+                times.append(min(benchmark.timeMix(arity, addShare, prefill, operations, seed) for seed in range(benchmark.repetitions)))
+            print(f"{name:17} " + " ".join(f"{elapsed:6.2f}s" for elapsed in times))
+        print(sys.version)
+
+if __name__ == '__main__':
+    HeapArityBenchmark.run(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,101 @@
+import heapq
+import random
+import sys
+import time
+
+from .heap import MinHeap
+from .heap import MaxHeap
+
+'''
+Ordering validation harness and randomized benchmark of the Heap against
+heapq.
+
+The harness runs random mixes of add and next on a MinHeap and a MaxHeap,
+with int and float weights, and checks that every extracted weight is
+the one heapq extracts. The benchmark then times pushing and popping the
+same random weights on a MinHeap and on heapq.
+
+Run from the repository root, optionally with the number of operations:
+    python -m general.heapBenchmark [operations]
+'''
+class HeapBenchmark:
+
+    '''
+    Runs 'operations' random adds and nexts on a new Heap of the given
+    class, mirrored on heapq, then drains both. 'sign' is 1 for a MinHeap
+    and -1 for a MaxHeap, whose weights heapq holds negated.
+
+    Raises a ValueError on the first extracted weight that differs.
+    '''
+    @staticmethod
+    def validate(cls, sign, operations, seed):
+        generator = random.Random(seed)
+        heap = cls()
+        reference = []
+        for i in range(operations):
+            if not reference or generator.random() < 0.52:
+                if i & 1:
+                    weight = generator.randrange(50000)
+                else:
+                    weight = generator.random()
+                heap.add(i, weight)
+                heapq.heappush(reference, sign * weight)
+            else:
+                weight, data = heap.next()
+                expected = sign * heapq.heappop(reference)
+                if weight != expected:
+                    raise ValueError(f"{cls.__name__} extracted {weight} at operation {i}, heapq {expected}")
+            if heap.size() != len(reference):
+                raise ValueError(f"{cls.__name__} holds {heap.size()} items at operation {i}, heapq {len(reference)}")
+        while reference:
+            weight, data = heap.next()
+            expected = sign * heapq.heappop(reference)
+            if weight != expected:
+                raise ValueError(f"{cls.__name__} extracted {weight} while draining, heapq {expected}")
+        if heap.next() != (None, None):
+            raise ValueError(f"an empty {cls.__name__} did not return (None, None)")
+
+    '''
+    Times pushing then popping the weights on a MinHeap and on heapq.
+
+    Returns a tuple of the four times, in seconds:
+    (Heap push, Heap pop, heapq push, heapq pop).
+    '''
+    @staticmethod
+    def benchmark(weights):
+        heap = MinHeap()
+        start = time.perf_counter()
+        for i, weight in enumerate(weights):
+            heap.add(i, weight)
+        heapPush = time.perf_counter() - start
+        start = time.perf_counter()
+        for weight in weights:
+            heap.next()
+        heapPop = time.perf_counter() - start
+        reference = []
+        start = time.perf_counter()
+        for i, weight in enumerate(weights):
+            heapq.heappush(reference, (weight, i))
+        heapqPush = time.perf_counter() - start
+        start = time.perf_counter()
+        for weight in weights:
+            heapq.heappop(reference)
+        heapqPop = time.perf_counter() - start
+        return (heapPush, heapPop, heapqPush, heapqPop)
+
+    @staticmethod
+    def run(operations=10**6):
+        for cls, sign in ((MinHeap, 1), (MaxHeap, -1)):
+            start = time.perf_counter()
+            HeapBenchmark.validate(cls, sign, operations, 17)
+            print(f"{cls.__name__}: {operations} mixed operations match heapq ({time.perf_counter() - start:.2f}s)")
+        generator = random.Random(4)
+        weights = [generator.random() for i in range(operations // 5)]
+        heapPush, heapPop, heapqPush, heapqPop = HeapBenchmark.benchmark(weights)
+        print(f"{len(weights)} random weights   push     pop")
+        print(f"MinHeap                  {heapPush:5.2f}s  {heapPop:5.2f}s")
+        print(f"heapq                    {heapqPush:5.2f}s  {heapqPop:5.2f}s")
+        print(sys.version)
+
+if __name__ == '__main__':
+    HeapBenchmark.run(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,89 @@
+import threading
+import time
+
+from .heap import MinHeap
+
+'''
+Thread-safe priority queue around a Heap, for handing weighted items
+between threads. A get blocks until an item is available.
+
+Items are returned as the Heap returns them:
+    (weight, data)
+'''
+class HeapQueue:
+
+    '''
+    Creates a new HeapQueue around the given Heap, a new MinHeap by default.
+    The Heap must not be used directly afterwards.
+    '''
+    def __init__(self, heap=None):
+        if heap == None:
+            self.heap = MinHeap()
+        else:
+            self.heap = heap
+        self.notEmpty = threading.Condition(threading.Lock())
+
+    '''
+    Adds the data with the given weight, waking one waiting get.
+    '''
+    def put(self, data, weight=0):
+        with self.notEmpty:
+            self.heap.add(data, weight)
+            self.notEmpty.notify()
+
+    '''
+    Alias for the put method
+    '''
+    def add(self, data, weight=0):
+        self.put(data, weight)
+
+    '''
+    Extracts the next item, waiting for one to be put if the queue is
+    empty. Waits for at most 'timeout' seconds when given, forever
+    otherwise.
+
+    Returns the next item, or (None, None) if the timeout expired first.
+    '''
+    def get(self, timeout=None):
+        with self.notEmpty:
+            if timeout == None:
+                while self.heap.size() <= 0:
+                    self.notEmpty.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while self.heap.size() <= 0:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return (None, None)
+                    self.notEmpty.wait(remaining)
+            return self.heap.next()
+
+    '''
+    Extracts the next item without waiting.
+
+    Returns the next item, or (None, None) if the queue is empty.
+    '''
+    def next(self):
+        with self.notEmpty:
+            return self.heap.next()
+
+    '''
+    Gets the next item without extracting it, None if the queue is empty.
+
+    Works whether the wrapped queue peeks at a HeapNode, as a Heap does,
+    or at a (weight, data) tuple, as the array backed queues do.
+    '''
+    def peek(self):
+        with self.notEmpty:
+            node = self.heap.peek()
+            if node is None or isinstance(node, tuple):
+                return node
+            return node.getData()
+
+    '''
+    Gets the number of queued items. Other threads may change it as soon
+    as it is returned.
+    '''
+    def size(self):
+        with self.notEmpty:
+            return self.heap.size()
@@ -0,0 +1,130 @@
+import random
+import sys
+import threading
+import time
+
+from .heap import MaxHeap
+from .heapQueue import HeapQueue
+
+'''
+Stress test and throughput benchmark of the HeapQueue.
+
+The stress test passes items from 8 producer threads to 8 consumer
+threads, which must receive every item exactly once. It also checks that
+a get times out with (None, None) and that a blocked get is woken by a
+put.
+
+Run from the repository root:
+    python -m general.heapQueueStress
+'''
+class HeapQueueStress:
+
+    producers = 8
+    consumers = 8
+    # items put by each producer
+    puts = 5000
+
+    '''
+    Passes every item from the producers to the consumers.
+
+    Raises a ValueError if an item is lost or received twice.
+    '''
+    @staticmethod
+    def stress():
+        stress = HeapQueueStress
+        queue = HeapQueue()
+        received = []
+        receivedLock = threading.Lock()
+
+        def produce(producer):
+            generator = random.Random(producer)
+            for i in range(stress.puts):
+                queue.put((producer, i), generator.random())
+
+        def consume():
+            while True:
+                weight, data = queue.get(timeout=0.5)
+                if data is None:
+                    return
+                with receivedLock:
+                    received.append(data)
+
+        threads = [threading.Thread(target=produce, args=(producer,)) for producer in range(stress.producers)]
+        threads.extend(threading.Thread(target=consume) for consumer in range(stress.consumers))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        expected = [(producer, i) for producer in range(stress.producers) for i in range(stress.puts)]
+        if sorted(received) != expected:
+            raise ValueError(f"received {len(received)} items, {len(set(received))} distinct, expected {len(expected)}")
+        if queue.size() != 0:
+            raise ValueError(f"{queue.size()} items were left in the queue")
+
+    '''
+    Checks the timeout of get, a get woken by a put, and a wrapped MaxHeap.
+
+    Raises a ValueError if any of them misbehaves.
+    '''
+    @staticmethod
+    def checkBlocking():
+        queue = HeapQueue()
+        start = time.monotonic()
+        if queue.get(timeout=0.2) != (None, None):
+            raise ValueError("get on an empty queue did not time out")
+        if time.monotonic() - start < 0.2:
+            raise ValueError("get timed out early")
+        received = []
+        waiter = threading.Thread(target=lambda: received.append(queue.get()))
+        waiter.start()
+        time.sleep(0.1)
+        queue.put('item', 1)
+        waiter.join(1)
+        if received != [(1, 'item')]:
+            raise ValueError(f"a blocked get received {received}")
+        queue = HeapQueue(MaxHeap())
+        for weight in (3, 9, 1):
+            queue.put(weight, weight)
+        if queue.peek() != (9, 9) or queue.next() != (9, 9):
+            raise ValueError("a HeapQueue around a MaxHeap did not return its largest item")
+
+    '''
+    Passes 'total' items from 'threads' producers to as many consumers.
+
+    Returns the throughput in put and get pairs per second.
+    '''
+    @staticmethod
+    def throughput(threads, total=200000):
+        queue = HeapQueue()
+        perThread = total // threads
+
+        def produce(seed):
+            generator = random.Random(seed)
+            for i in range(perThread):
+                queue.put(i, generator.random())
+
+        def consume():
+            for i in range(perThread):
+                queue.get()
+
+        workers = [threading.Thread(target=produce, args=(seed,)) for seed in range(threads)]
+        workers.extend(threading.Thread(target=consume) for consumer in range(threads))
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return perThread * threads / (time.perf_counter() - start)
+
+    @staticmethod
+    def run():
+        HeapQueueStress.stress()
+        print(f"stress ok: {HeapQueueStress.producers} producers, {HeapQueueStress.consumers} consumers")
+        HeapQueueStress.checkBlocking()
+        print("blocking ok")
+        for threads in (1, 4, 16):
+            print(f"{threads:2} producers + {threads:2} consumers: {HeapQueueStress.throughput(threads):.0f} put+get/s")
+        print(sys.version)
+
+if __name__ == '__main__':
+    HeapQueueStress.run()
@@ -0,0 +1,299 @@
+from .heap import MinArrayHeap
+
+# imported by NumpyHeap.requireNumpy on first use
+numpy = None
+
+'''
+Base class for a priority queue of numeric weights and integer payload
+indices held in NumPy arrays, for data pushed and popped in batches.
+
+Sifting items one by one can not be vectorized, so the bulk of the items
+is kept as one run sorted by priority, read from a head offset, which
+popK slices in O(k). Single items, and batches small next to the run,
+wait in a MinArrayHeap instead, and peek, next and popK take whichever
+of its root and the head of the run comes first, so single adds and
+extractions stay O(log p) for p waiting items.
+
+Items are merged into the run by sorting them alone and inserting them
+at the positions a binary search gives, which moves the run once. The
+waiting items are merged once they pass a fraction of the run, keeping
+the merges O(1) amortized per item. Larger batches are kept aside as
+they are and merged together on the next peek, next or popK, so a series
+of pushArray calls costs a single merge.
+
+Every weight is stored multiplied by the class's sign, as for an
+ArrayHeap, so that the smallest stored weight always comes first. Equal
+weights come out in no particular order.
+
+NumPy is only imported once a NumpyHeap is created or its static
+methods are called, so importing this module neither needs it nor pays
+for loading it.
+'''
+class NumpyHeap:
+
+    sign = 1
+    # waiting items kept before merging them, at least and per item of the run
+    minPending = 1024
+    pendingFraction = 0.25
+    # a heap push costs about as much as moving this many items of the run
+    batchRatio = 256
+
+    '''
+    Imports NumPy on first use.
+
+    Raises an ImportError if NumPy is not installed.
+    '''
+    @staticmethod
+    def requireNumpy():
+        global numpy
+        if numpy is None:
+            try:
+                import numpy
+            except ImportError:
+                raise ImportError("a NumpyHeap requires NumPy to be installed")
+
+    '''
+    Gets the 'k' lowest weights of a whole batch by partition based
+    selection, in O(n + k log k), without pushing them.
+
+    Returns a tuple (weights, indices) of arrays ordered from lowest to
+    highest weight, the indices being positions in 'weights' or the
+    matching entries of 'indices' when given.
+    '''
+    @staticmethod
+    def nsmallest(k, weights, indices=None):
+        NumpyHeap.requireNumpy()
+        weights = numpy.asarray(weights)
+        size = len(weights)
+        k = max(0, min(k, size))
+        if k < size:
+            chosen = numpy.argpartition(weights, k - 1)[:k] if k > 0 else numpy.arange(0)
+        else:
+            chosen = numpy.arange(size)
+        chosen = chosen[numpy.argsort(weights[chosen], kind='stable')]
+        if indices is None:
+            return (weights[chosen], chosen)
+        return (weights[chosen], numpy.asarray(indices)[chosen])
+
+    '''
+    Gets the 'k' highest weights of a whole batch, see nsmallest.
+
+    Returns a tuple (weights, indices) of arrays ordered from highest to
+    lowest weight.
+    '''
+    @staticmethod
+    def nlargest(k, weights, indices=None):
+        NumpyHeap.requireNumpy()
+        weights = numpy.asarray(weights)
+        size = len(weights)
+        k = max(0, min(k, size))
+        if k < size:
+            chosen = numpy.argpartition(weights, size - k)[size - k:] if k > 0 else numpy.arange(0)
+        else:
+            chosen = numpy.arange(size)
+        chosen = chosen[numpy.argsort(weights[chosen], kind='stable')[::-1]]
+        if indices is None:
+            return (weights[chosen], chosen)
+        return (weights[chosen], numpy.asarray(indices)[chosen])
+
+    '''
+    Creates a new NumpyHeap.
+
+    Raises an ImportError if NumPy is not installed.
+    '''
+    def __init__(self):
+        NumpyHeap.requireNumpy()
+        self.weights = numpy.empty(0, dtype=numpy.float64)
+        self.indices = numpy.empty(0, dtype=numpy.int64)
+        self.head = 0
+        # items waiting to be merged, their weights already multiplied by sign
+        self.pending = MinArrayHeap()
+        self.batchWeights = []
+        self.batchIndices = []
+        self.batchSize = 0
+
+    '''
+    Gets the Size of the Heap.
+    '''
+    def size(self):
+        return len(self.weights) - self.head + self.pending.size() + self.batchSize
+
+    '''
+    Checks if the waiting items, plus 'incoming' more, pass the fraction
+    of the run that calls for a merge.
+    '''
+    def overPending(self, incoming=0):
+        waiting = self.pending.size() + incoming
+        return waiting > self.minPending and waiting > self.pendingFraction * (len(self.weights) - self.head)
+
+    '''
+    Adds arrays of weights and of the matching payload indices in bulk.
+
+    Raises a ValueError if both arrays do not have the same length.
+    '''
+    def pushArray(self, weights, indices):
+        weights = numpy.asarray(weights, dtype=numpy.float64)
+        indices = numpy.asarray(indices, dtype=numpy.int64)
+        if weights.shape != indices.shape or weights.ndim != 1:
+            raise ValueError(f"pushArray expected two flat arrays of the same length, got {weights.shape} and {indices.shape}")
+        count = len(weights)
+        if count == 0:
+            return
+        weights = weights * self.sign
+        if count * self.batchRatio >= len(self.weights) - self.head or self.overPending(count):
+            self.batchWeights.append(weights)
+            self.batchIndices.append(indices)
+            self.batchSize = self.batchSize + count
+            return
+        pending = self.pending
+        for weight, index in zip(weights.tolist(), indices.tolist()):
+            pending.add(index, weight)
+
+    '''
+    Performs an add operation for a single payload index, in O(log p)
+    plus an O(1) amortized share of the merges.
+    '''
+    def add(self, data, weight=0):
+        self.pending.add(int(data), self.sign * weight)
+        if self.overPending():
+            self.settle()
+
+    '''
+    Merges the waiting items and the batches kept aside into the run.
+    '''
+    def settle(self):
+        weightParts = self.batchWeights
+        indexParts = self.batchIndices
+        pending = self.pending
+        if pending.size() > 0:
+            weightParts.append(numpy.array(pending.weights, dtype=numpy.float64))
+            indexParts.append(numpy.array(pending.payloads, dtype=numpy.int64))
+            self.pending = MinArrayHeap()
+        if not weightParts:
+            return
+        weights = numpy.concatenate(weightParts)
+        order = numpy.argsort(weights, kind='stable')
+        weights = weights[order]
+        indices = numpy.concatenate(indexParts)[order]
+        self.batchWeights = []
+        self.batchIndices = []
+        self.batchSize = 0
+        run = self.weights[self.head:]
+        if len(run) > 0:
+            # after the run items of equal weight
+            positions = numpy.searchsorted(run, weights, side='right')
+            weights = numpy.insert(run, positions, weights)
+            indices = numpy.insert(self.indices[self.head:], positions, indices)
+        self.weights = weights
+        self.indices = indices
+        self.head = 0
+
+    '''
+    Releases the run once every item of it has been extracted.
+    '''
+    def trimRun(self):
+        if self.head == len(self.weights):
+            self.weights = self.weights[:0]
+            self.indices = self.indices[:0]
+            self.head = 0
+
+    '''
+    Extracts up to 'k' of the next elements, in O(k log k) plus O(log p)
+    for each one coming from the waiting items.
+
+    Returns a tuple (weights, indices) of arrays in priority order.
+    '''
+    def popK(self, k):
+        if self.batchSize > 0:
+            self.settle()
+        weights = self.weights
+        head = self.head
+        runLeft = len(weights) - head
+        k = max(k, 0)
+        pending = self.pending
+        pendingWeights = pending.weights
+        takenWeights = []
+        takenIndices = []
+        # each waiting item taken pushes the last run item out of the k
+        while len(takenWeights) < k and pendingWeights:
+            fromRun = k - len(takenWeights)
+            if fromRun <= runLeft and not pendingWeights[0] < weights[head + fromRun - 1]:
+                break
+            weight, index = pending.next()
+            takenWeights.append(weight)
+            takenIndices.append(index)
+        stop = head + min(k - len(takenWeights), runLeft)
+        popWeights = weights[head:stop]
+        popIndices = self.indices[head:stop]
+        self.head = stop
+        if takenWeights:
+            popWeights = numpy.concatenate((popWeights, numpy.array(takenWeights, dtype=numpy.float64)))
+            popIndices = numpy.concatenate((popIndices, numpy.array(takenIndices, dtype=numpy.int64)))
+            order = numpy.argsort(popWeights, kind='stable')
+            popWeights = popWeights[order]
+            popIndices = popIndices[order]
+        else:
+            popIndices = popIndices.copy()
+        self.trimRun()
+        return (popWeights * self.sign, popIndices)
+
+    '''
+    Checks if the next element is the root of the waiting items rather
+    than the head of the run, which must not both be empty.
+    '''
+    def nextIsPending(self):
+        pendingWeights = self.pending.weights
+        return len(pendingWeights) > 0 and (self.head == len(self.weights) or pendingWeights[0] < self.weights[self.head])
+
+    '''
+    Gets the next element without extracting it, as (weight, index), or
+    None if the Heap is empty.
+    '''
+    def peek(self):
+        if self.size() == 0:
+            return None
+        if self.batchSize > 0:
+            self.settle()
+        if self.nextIsPending():
+            weight, index = self.pending.peek()
+        else:
+            weight = self.weights[self.head]
+            index = self.indices[self.head]
+        return (float(weight * self.sign), int(index))
+
+    '''
+    Extracts the next element of the Heap, in O(log p) from the waiting
+    items or O(1) from the run.
+
+    Note: Elements are returned in the following format
+        (weight, index)
+
+    Returns the next element, (None, None) if the Heap is empty.
+    '''
+    def next(self):
+        if self.size() == 0:
+            return (None, None)
+        if self.batchSize > 0:
+            self.settle()
+        if self.nextIsPending():
+            weight, index = self.pending.next()
+        else:
+            weight = self.weights[self.head]
+            index = self.indices[self.head]
+            self.head = self.head + 1
+            self.trimRun()
+        return (float(weight * self.sign), int(index))
+
+'''
+Implementation of a NumPy backed Min Heap.
+'''
+class MinNumpyHeap(NumpyHeap):
+
+    sign = 1
+
+'''
+Implementation of a NumPy backed Max Heap, storing negated weights.
+'''
+class MaxNumpyHeap(NumpyHeap):
+
+    sign = -1
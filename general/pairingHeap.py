@@ -0,0 +1,154 @@
+from .heap import HeapNode
+
+'''
+A HeapNode of a PairingHeap, linking to its first child and its next
+sibling.
+'''
+class PairingNode(HeapNode):
+
+    def __init__(self, data, weight):
+        super().__init__(data, weight)
+        self.child = None
+        self.sibling = None
+
+'''
+Base class for a meldable Heap, implemented as a pairing heap: a tree
+where every node has a higher priority than its children.
+
+Adding and melding link two trees in O(1), while extracting pairs up the
+children of the root in O(log n) amortized. Melding makes it possible to
+combine heaps, such as per shard queues, without moving their items.
+
+Should be overriden by a class that implements the static method
+compareNodes, as for a Heap.
+'''
+class PairingHeap:
+
+    '''
+    Returns True if elem1 should be given a higher priority than elem2.
+    '''
+    @staticmethod
+    def compareNodes(elem1, elem2):
+        return False
+
+    def __init__(self):
+        self.root = None
+        self.count = 0
+
+    '''
+    Links two trees, making the root of lower priority the first child of
+    the other one.
+
+    Returns the root of the linked tree.
+    '''
+    def link(self, first, second):
+        if first is None:
+            return second
+        if second is None:
+            return first
+        if self.compareNodes(second, first):
+            first, second = second, first
+        second.sibling = first.child
+        first.child = second
+        return first
+
+    '''
+    Gets the next element without extracting it, as a HeapNode, or None
+    if the Heap is empty.
+    '''
+    def peek(self):
+        return self.root
+
+    '''
+    Gets the Size of the Heap.
+    '''
+    def size(self):
+        return self.count
+
+    '''
+    Performs an add operation on the Heap, in O(1).
+    '''
+    def add(self, data, weight=0):
+        self.root = self.link(self.root, PairingNode(data, weight))
+        self.count = self.count + 1
+
+    '''
+    Moves every item of the 'other' Heap into this one in O(1), leaving
+    the other empty.
+
+    Raises a ValueError if the Heaps do not share the same priority.
+    '''
+    def meld(self, other):
+        if self.compareNodes is not other.compareNodes:
+            raise ValueError("only Heaps with the same priority can be melded")
+        if other is self:
+            return
+        self.root = self.link(self.root, other.root)
+        self.count = self.count + other.count
+        other.root = None
+        other.count = 0
+
+    '''
+    Extracts the next element of the Heap, in O(log n) amortized.
+
+    Note: Elements are returned in the following format
+        (weight, data)
+
+    Returns the next element, (None, None) if the Heap is empty.
+    '''
+    def next(self):
+        root = self.root
+        if root is None:
+            return (None, None)
+        # first pass links the children in pairs from left to right
+        pairs = []
+        child = root.child
+        while child is not None:
+            second = child.sibling
+            if second is None:
+                child.sibling = None
+                pairs.append(child)
+                break
+            following = second.sibling
+            child.sibling = None
+            second.sibling = None
+            pairs.append(self.link(child, second))
+            child = following
+        # second pass links the pairs from right to left
+        newRoot = None
+        while pairs:
+            newRoot = self.link(pairs.pop(), newRoot)
+        self.root = newRoot
+        self.count = self.count - 1
+        root.child = None
+        return root.getData()
+
+    def __str__(self):
+        heapStr = ""
+        stack = [] if self.root is None else [self.root]
+        while stack:
+            node = stack.pop()
+            heapStr = heapStr + str(node) + "\n"
+            child = node.child
+            while child is not None:
+                stack.append(child)
+                child = child.sibling
+        return heapStr
+
+'''
+Implementation of a meldable Min Heap.
+'''
+class MinPairingHeap(PairingHeap):
+
+    @staticmethod
+    def compareNodes(elem1, elem2):
+        return elem1 < elem2
+
+'''
+Implementation of a meldable Max Heap.
+'''
+class MaxPairingHeap(PairingHeap):
+
+    @staticmethod
+    def compareNodes(elem1, elem2):
+        return elem1 > elem2
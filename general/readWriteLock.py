@@ -0,0 +1,91 @@
+import threading
+
+'''
+One side, reading or writing, of a ReadWriteLock as a context manager.
+'''
+class LockSide:
+
+    __slots__ = ('acquire', 'release')
+
+    def __init__(self, acquire, release):
+        self.acquire = acquire
+        self.release = release
+
+    def __enter__(self):
+        self.acquire()
+
+    def __exit__(self, *excInfo):
+        self.release()
+
+'''
+A readers-writer lock, letting any number of readers hold it together
+while a writer holds it alone.
+
+Waiting writers are preferred: once a writer waits, new readers wait
+behind it, so a steady stream of readers can not starve the writers.
+
+The lock is not reentrant. A thread holding it must not acquire it again,
+for reading or writing, or it may deadlock behind a waiting writer.
+'''
+class ReadWriteLock:
+
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.readers = 0
+        self.writing = False
+        self.waitingWriters = 0
+        self.readSide = LockSide(self.acquireRead, self.releaseRead)
+        self.writeSide = LockSide(self.acquireWrite, self.releaseWrite)
+
+    '''
+    Blocks until no writer holds or waits for the lock, then holds it for
+    reading.
+    '''
+    def acquireRead(self):
+        with self.condition:
+            while self.writing or self.waitingWriters > 0:
+                self.condition.wait()
+            self.readers = self.readers + 1
+
+    '''
+    Releases the lock held for reading.
+    '''
+    def releaseRead(self):
+        with self.condition:
+            self.readers = self.readers - 1
+            if self.readers == 0:
+                self.condition.notify_all()
+
+    '''
+    Blocks until no reader or writer holds the lock, then holds it for
+    writing.
+    '''
+    def acquireWrite(self):
+        with self.condition:
+            self.waitingWriters = self.waitingWriters + 1
+            while self.writing or self.readers > 0:
+                self.condition.wait()
+            self.waitingWriters = self.waitingWriters - 1
+            self.writing = True
+
+    '''
+    Releases the lock held for writing.
+    '''
+    def releaseWrite(self):
+        with self.condition:
+            self.writing = False
+            self.condition.notify_all()
+
+    '''
+    Gets a context manager holding the lock for reading:
+        with lock.readLocked():
+            ...
+    '''
+    def readLocked(self):
+        return self.readSide
+
+    '''
+    Gets a context manager holding the lock for writing.
+    '''
+    def writeLocked(self):
+        return self.writeSide
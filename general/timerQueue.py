@@ -0,0 +1,233 @@
+import time
+
+from .heap import MinHeap
+
+'''
+Handle of a timer in a TimerQueue, returned by add and taken by cancel.
+
+The owner is the TimerQueue while the timer is pending, None once it has
+been extracted or cancelled.
+'''
+class TimerHandle:
+
+    __slots__ = ('data', 'deadline', 'owner')
+
+    def __init__(self, data, deadline, owner):
+        self.data = data
+        self.deadline = deadline
+        self.owner = owner
+
+    def __str__(self):
+        return f"{self.deadline}:{str(self.data)}"
+
+'''
+Timer queue built on a MinHeap of deadlines, with O(1) cancellation.
+
+Cancelling only marks the timer, leaving a tombstone in the Heap that is
+skipped once it reaches the root. When the tombstones pass 'threshold'
+of the Heap, it is rebuilt from the pending timers in O(n), so cancelled
+timers can not inflate it more than 1 / (1 - threshold) times.
+
+Deadlines are read from 'clock', time.monotonic by default, the clock of
+the asyncio event loops. Equal deadlines come out in no particular order.
+
+Items are returned as a Heap returns them:
+    (deadline, data)
+
+The queue is not thread-safe, it is meant to be used from one thread,
+such as the one running an event loop.
+'''
+class TimerQueue:
+
+    # fewest tombstones worth a compaction
+    minTombstones = 64
+
+    '''
+    Creates a new, empty, TimerQueue.
+
+    Raises a ValueError if the threshold is not between 0 and 1.
+    '''
+    def __init__(self, clock=time.monotonic, threshold=0.5):
+        if not 0 < threshold < 1:
+            raise ValueError(f"a TimerQueue threshold must be between 0 and 1, got {threshold}")
+        self.clock = clock
+        self.threshold = threshold
+        self.heap = MinHeap()
+        self.tombstones = 0
+        # future a pending waitNext sleeps on
+        self.waiter = None
+
+    '''
+    Gets the number of pending timers.
+    '''
+    def size(self):
+        return self.heap.size() - self.tombstones
+
+    '''
+    Override for the 'in' keyword. True if the given handle, returned by
+    add, is still pending in this TimerQueue.
+    '''
+    def __contains__(self, handle):
+        return getattr(handle, 'owner', None) is self
+
+    '''
+    Adds the data, due at the given deadline on the queue's clock, in
+    O(log n). Wakes a pending waitNext if it is the new earliest timer.
+
+    Returns a TimerHandle for cancel.
+    '''
+    def add(self, data, deadline):
+        handle = TimerHandle(data, deadline, self)
+        node = self.heap.add(handle, deadline)
+        if self.waiter is not None and self.heap.peek() is node:
+            self.wake()
+        return handle
+
+    '''
+    Adds the data, due 'delay' seconds from now, see add.
+    '''
+    def addLater(self, data, delay):
+        return self.add(data, self.clock() + delay)
+
+    '''
+    Cancels the timer of the given handle, returned by add, in O(1)
+    amortized.
+
+    Returns True if the timer was pending, False if it had already been
+    extracted or cancelled.
+    '''
+    def cancel(self, handle):
+        if handle.owner is not self:
+            return False
+        handle.owner = None
+        self.tombstones = self.tombstones + 1
+        if self.tombstones > self.minTombstones and self.tombstones > self.threshold * self.heap.size():
+            self.compact()
+        return True
+
+    '''
+    Rebuilds the Heap from the pending timers only, in O(n).
+    '''
+    def compact(self):
+        pending = [(node.data, node.weight) for node in self.heap.storage[MinHeap.getRootIndex():] if node.data.owner is self]
+        self.heap = MinHeap.fromIterable(pending)
+        self.tombstones = 0
+
+    '''
+    Extracts the cancelled timers at the root of the Heap.
+
+    Returns the HeapNode of the earliest pending timer, None if there is
+    none.
+    '''
+    def skipCancelled(self):
+        heap = self.heap
+        node = heap.peek()
+        while node is not None and node.data.owner is not self:
+            heap.next()
+            self.tombstones = self.tombstones - 1
+            node = heap.peek()
+        return node
+
+    '''
+    Gets the deadline of the earliest pending timer, None if there is none.
+    '''
+    def nextDeadline(self):
+        node = self.skipCancelled()
+        if node is None:
+            return None
+        return node.weight
+
+    '''
+    Gets the earliest pending timer without extracting it, as
+    (deadline, data), or None if there is none.
+    '''
+    def peek(self):
+        node = self.skipCancelled()
+        if node is None:
+            return None
+        return (node.weight, node.data.data)
+
+    '''
+    Extracts the earliest pending timer, whether it is due or not.
+
+    Returns the timer as (deadline, data), (None, None) if there is none.
+    '''
+    def next(self):
+        if self.skipCancelled() is None:
+            return (None, None)
+        deadline, handle = self.heap.next()
+        handle.owner = None
+        return (deadline, handle.data)
+
+    '''
+    Extracts every pending timer due at 'now', the current time of the
+    clock by default.
+
+    Returns the list of the timers as (deadline, data), earliest first.
+    '''
+    def popDue(self, now=None):
+        if now == None:
+            now = self.clock()
+        heap = self.heap
+        storage = heap.storage
+        root = MinHeap.getRootIndex()
+        due = []
+        while storage[0] > 0 and storage[root].weight <= now:
+            deadline, handle = heap.next()
+            if handle.owner is self:
+                handle.owner = None
+                due.append((deadline, handle.data))
+            else:
+                self.tombstones = self.tombstones - 1
+        return due
+
+    '''
+    Resolves the future of a pending waitNext, so that it checks the
+    earliest deadline again.
+    '''
+    def wake(self):
+        if not self.waiter.done():
+            self.waiter.set_result(None)
+
+    '''
+    Coroutine sleeping until the earliest pending timer is due, or until
+    one is added if there is none. A timer added meanwhile with an earlier
+    deadline wakes it up early, so it never oversleeps. Call popDue
+    afterwards to extract the other timers due by then.
+
+    Only one waitNext may be pending at a time, and timers must be added
+    from the thread running its event loop.
+
+    Raises a RuntimeError if another waitNext is already pending.
+
+    Returns the timer as (deadline, data), extracting it.
+    '''
+    async def waitNext(self):
+        # imported here so that importing the queue does not load asyncio
+        import asyncio
+        if self.waiter is not None:
+            raise RuntimeError("a TimerQueue can only have one pending waitNext")
+        loop = asyncio.get_running_loop()
+        while True:
+            deadline = self.nextDeadline()
+            if deadline is not None:
+                delay = deadline - self.clock()
+                if delay <= 0:
+                    return self.next()
+            self.waiter = loop.create_future()
+            timer = None
+            if deadline is not None:
+                timer = loop.call_later(delay, self.wake)
+            try:
+                await self.waiter
+            finally:
+                self.waiter = None
+                if timer is not None:
+                    timer.cancel()
+
+    def __str__(self):
+        queueStr = ""
+        for node in self.heap.storage[MinHeap.getRootIndex():]:
+            if node.data.owner is self:
+                queueStr = queueStr + str(node.data) + "\n"
+        return queueStr